@@ -1,27 +1,82 @@
 """FastAPI app: run workflow, HITL resume, state inspection. All responses PII-redacted."""
 
-from typing import Any
-
-from fastapi import FastAPI, HTTPException
+import asyncio
+from collections import defaultdict
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Iterator
+
+import anyio
+import orjson
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from langgraph.types import Command
 from pydantic import BaseModel, Field
 
+from .config import CHECKPOINT_DURABILITY
 from .graph import build_graph
 from .persistence import get_checkpointer
 from .security import redact_pii
 from .state import InvoiceReconciliationState
 
-app = FastAPI(title="Enterprise Invoice Reconciliation Agent", version="0.1.0")
 
-# Lazy graph: build once with SQLite checkpointer
-_checkpointer = None
+def _dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON via orjson (much faster on large `reconciled` payloads); Decimals render as strings."""
+
+    def render(self, content: Any) -> bytes:
+        return _dumps(content)
+
+
+class StateChanges:
+    """Per-thread change signals: checkpoint writes (worker threads) wake /state/stream subscribers."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._subscribers: dict[str, set[asyncio.Event]] = defaultdict(set)
+
+    def notify(self, thread_id: str) -> None:
+        """Thread-safe; called by the checkpointer after each put."""
+        self._loop.call_soon_threadsafe(self._wake, thread_id)
 
+    def _wake(self, thread_id: str) -> None:
+        for event in self._subscribers.get(thread_id, ()):
+            event.set()
 
-def get_graph():
-    global _checkpointer
-    if _checkpointer is None:
-        _checkpointer = get_checkpointer()
-    return build_graph(_checkpointer)
+    @contextmanager
+    def subscribe(self, thread_id: str) -> Iterator[asyncio.Event]:
+        event = asyncio.Event()
+        self._subscribers[thread_id].add(event)
+        try:
+            yield event
+        finally:
+            self._subscribers[thread_id].discard(event)
+            if not self._subscribers[thread_id]:
+                del self._subscribers[thread_id]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Compile the graph once with the SQLite checkpointer; endpoints reuse app.state.graph."""
+    checkpointer = get_checkpointer()
+    app.state.state_changes = StateChanges(asyncio.get_running_loop())
+    checkpointer.on_put.append(app.state.state_changes.notify)
+    app.state.graph = build_graph(checkpointer)
+    try:
+        yield
+    finally:
+        # Close the pooled connections so the WAL is checkpointed and removed on shutdown
+        checkpointer.pool.close()
+
+
+app = FastAPI(
+    title="Enterprise Invoice Reconciliation Agent",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 
 class RunRequest(BaseModel):
@@ -39,40 +94,61 @@ class ResumeRequest(BaseModel):
 
 
 @app.post("/run")
-def run(req: RunRequest) -> dict[str, Any]:
+async def run(req: RunRequest, request: Request) -> dict[str, Any]:
     """Start reconciliation. Returns state or __interrupt__ when waiting for approval."""
-    graph = get_graph()
+    graph = request.app.state.graph
     config = {"configurable": {"thread_id": req.thread_id}}
     initial: InvoiceReconciliationState = {
         "vendor_id": req.vendor_id,
         "messages": [],
         "retry_count": 0,
     }
-    result = graph.invoke(initial, config=config)
-    return redact_pii(_state_to_response(result))
+    # graph.invoke blocks on tools and SQLite; keep it off the event loop
+    result = await anyio.to_thread.run_sync(
+        lambda: graph.invoke(initial, config=config, durability=CHECKPOINT_DURABILITY)
+    )
+    return redact_pii(result, in_place=True, skip_none=True)
 
 
 @app.post("/resume")
-def resume(req: ResumeRequest) -> dict[str, Any]:
+async def resume(req: ResumeRequest, request: Request) -> dict[str, Any]:
     """Resume after human approval. Call with approved=True/False after /run returns __interrupt__."""
-    graph = get_graph()
+    graph = request.app.state.graph
     config = {"configurable": {"thread_id": req.thread_id}}
-    result = graph.invoke(Command(resume=req.approved), config=config)
-    return redact_pii(_state_to_response(result))
+    result = await anyio.to_thread.run_sync(
+        lambda: graph.invoke(Command(resume=req.approved), config=config, durability=CHECKPOINT_DURABILITY)
+    )
+    return redact_pii(result, in_place=True, skip_none=True)
 
 
 @app.get("/state")
-def get_state(thread_id: str) -> dict[str, Any]:
+async def get_state(thread_id: str, request: Request) -> dict[str, Any]:
     """Get current state for a thread (e.g. for HITL UI). PII redacted."""
-    graph = get_graph()
+    graph = request.app.state.graph
     config = {"configurable": {"thread_id": thread_id}}
-    snapshot = graph.get_state(config)
+    snapshot = await anyio.to_thread.run_sync(lambda: graph.get_state(config))
     if not snapshot.values:
         raise HTTPException(status_code=404, detail="Thread not found")
-    return redact_pii(_state_to_response(dict(snapshot.values)))
+    return redact_pii(dict(snapshot.values), in_place=True, skip_none=True)
+
+
+@app.get("/state/stream")
+async def stream_state(thread_id: str, request: Request) -> StreamingResponse:
+    """Server-sent events: current state, then one event per checkpoint write. PII redacted."""
+    graph = request.app.state.graph
+    config = {"configurable": {"thread_id": thread_id}}
+    state_changes: StateChanges = request.app.state.state_changes
+
+    async def event_gen():
+        # Subscribe before the first read so a write in between is not missed
+        with state_changes.subscribe(thread_id) as changed:
+            while True:
+                snapshot = await anyio.to_thread.run_sync(lambda: graph.get_state(config))
+                if snapshot.values:
+                    state = redact_pii(dict(snapshot.values), in_place=True, skip_none=True)
+                    yield b"data: " + _dumps(state) + b"\n\n"
+                await changed.wait()
+                changed.clear()
 
+    return StreamingResponse(event_gen(), media_type="text/event-stream")
 
-def _state_to_response(state: dict) -> dict:
-    """Normalize state for JSON; include __interrupt__ if present (from invoke)."""
-    out = {k: v for k, v in state.items() if v is not None}
-    return out
\ No newline at end of file
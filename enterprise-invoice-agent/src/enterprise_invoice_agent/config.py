@@ -7,15 +7,27 @@ from pathlib import Path
 _default_db = Path(__file__).resolve().parent.parent.parent / "data" / "checkpoints.db"
 DEFAULT_DB_PATH = Path(os.getenv("DB_PATH", str(_default_db)))
 
+# Max SQLite connections per process for the checkpointer (concurrent reads under WAL)
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "4"))
+
 # HITL: approve any payment above this amount (USD)
 HITL_APPROVAL_THRESHOLD_USD = float(os.getenv("HITL_APPROVAL_THRESHOLD_USD", "5000"))
 
 # Self-correction: max retries for failed tool calls
 MAX_TOOL_RETRIES = int(os.getenv("MAX_TOOL_RETRIES", "3"))
 
+# When checkpoints are written: "exit" = once per invoke/resume (one commit per request),
+# "async"/"sync" = after every node (finer-grained crash recovery, more SQLite commits)
+CHECKPOINT_DURABILITY = os.getenv("CHECKPOINT_DURABILITY", "exit")
+if CHECKPOINT_DURABILITY not in ("exit", "async", "sync"):
+    raise ValueError(f"CHECKPOINT_DURABILITY must be 'exit', 'async' or 'sync', got {CHECKPOINT_DURABILITY!r}")
+
+# Max messages kept in graph state per thread (older ones are dropped from checkpoints)
+MAX_STATE_MESSAGES = int(os.getenv("MAX_STATE_MESSAGES", "200"))
+
 # LLM (for cost control, use cheaper model by default)
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 ANTHROPIC_MODEL = os.getenv("ANTHROPIC_MODEL", "claude-3-5-haiku-20241022")
 
 # PII: redact these keys in logs and API responses
-PII_KEYS = {"vendor_tax_id", "bank_account", "vendor_email", "buyer_email"}
+PII_KEYS = frozenset({"vendor_tax_id", "bank_account", "vendor_email", "buyer_email"})
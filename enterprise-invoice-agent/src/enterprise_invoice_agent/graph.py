@@ -1,5 +1,6 @@
 """LangGraph: Manager workflow with HITL and self-correction."""
 
+import logging
 from decimal import Decimal
 
 from langgraph.graph import END, START, StateGraph
@@ -10,6 +11,17 @@ from .state import InvoiceReconciliationState
 from .worker import get_payment_summary, reconcile_step
 from .tools import execute_payment
 
+logger = logging.getLogger(__name__)
+
+
+def _to_decimal(amount) -> Decimal:
+    """Decimal for a state amount; only floats need the repr() round-trip."""
+    if isinstance(amount, Decimal):
+        return amount
+    if isinstance(amount, int):
+        return Decimal(amount)
+    return Decimal(repr(float(amount)))
+
 
 def reconcile_node(state: InvoiceReconciliationState) -> dict:
     """
@@ -55,7 +67,8 @@ def check_approval_node(state: InvoiceReconciliationState):
     if not needs_approval:
         return {"approval": True, "status": "pending", "hitl_prompt": None}
 
-    get_payment_summary(invoice_id, Decimal(str(amount_usd)))  # optional: use for audit
+    if logger.isEnabledFor(logging.INFO):  # audit trail; skip the summary when nobody reads it
+        logger.info("HITL approval requested: %s", get_payment_summary(invoice_id, _to_decimal(amount_usd)))
     prompt = {
         "question": f"Ready to pay this ${amount_usd:,.2f} invoice. Approve?",
         "invoice_id": invoice_id,
@@ -76,26 +89,27 @@ def execute_payment_node(state: InvoiceReconciliationState) -> dict:
     pending = state.get("pending_payment") or {}
     approved = state.get("approval", False)
     invoice_id = pending.get("invoice_id", "")
-    amount_usd = Decimal(str(pending.get("amount", 0)))
+    amount_usd = _to_decimal(pending.get("amount", 0))
     vendor_id = pending.get("vendor_id", "")
     result = execute_payment(invoice_id=invoice_id, amount_usd=amount_usd, vendor_id=vendor_id, approved=approved)
     return {"result": result, "status": result.get("status", "paid") if approved else "cancelled"}
 
 
+# Status -> next node; statuses not listed fall through to the default branch
+_AFTER_RECONCILE = {"failed": "__end__"}
+_AFTER_APPROVAL = {"cancelled": "__end__"}
+
+
 def route_after_reconcile(state: InvoiceReconciliationState) -> str:
     """Manager: route to approval check or end (failed)."""
-    if state.get("status") == "failed":
-        return "__end__"
-    if state.get("pending_payment"):
-        return "check_approval"
-    return "__end__"
+    return _AFTER_RECONCILE.get(state.get("status")) or (
+        "check_approval" if state.get("pending_payment") else "__end__"
+    )
 
 
 def route_after_approval(state: InvoiceReconciliationState) -> str:
     """Route to execute payment or end (cancelled)."""
-    if state.get("status") == "cancelled":
-        return "__end__"
-    return "execute_payment"
+    return _AFTER_APPROVAL.get(state.get("status"), "execute_payment")
 
 
 def build_graph(checkpointer):
@@ -112,7 +126,3 @@ def build_graph(checkpointer):
     builder.add_edge("execute_payment", END)
 
     return builder.compile(checkpointer=checkpointer)
-</think>
-Fixing the graph: correcting conditional edges and removing duplicates.
-<｜tool▁calls▁begin｜><｜tool▁call▁begin｜>
-Read
\ No newline at end of file
@@ -1,16 +1,123 @@
 """State persistence: SQLite checkpointer for resumable long-running tasks."""
 
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Callable, Iterator
 
 from langgraph.checkpoint.sqlite import SqliteSaver
 
-from .config import DEFAULT_DB_PATH
+from .config import DEFAULT_DB_PATH, SQLITE_POOL_SIZE
+
+# WAL lets /state reads proceed while a run is writing checkpoints; NORMAL sync is safe under WAL.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA wal_autocheckpoint=1000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=20000",
+)
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    """Open a connection usable across threads, in autocommit mode, with the WAL pragmas."""
+    conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+class SqliteConnectionPool:
+    """
+    Up to `size` connections to one DB. Each thread is pinned to a pool slot on first use;
+    once the pool is full, new threads share slots round-robin (each slot has its own lock).
+    """
+
+    def __init__(self, path: Path, size: int = SQLITE_POOL_SIZE):
+        self.path = path
+        self.size = max(1, size)
+        self._conns: list[sqlite3.Connection] = []
+        self._locks: list[threading.Lock] = []
+        self._assigned = 0
+        self._guard = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+
+    def get(self) -> tuple[sqlite3.Connection, threading.Lock]:
+        """Return (connection, lock) for the calling thread."""
+        if self._closed:
+            raise RuntimeError(f"SQLite connection pool for {self.path} is closed")
+        slot = getattr(self._local, "slot", None)
+        if slot is None:
+            with self._guard:
+                if len(self._conns) < self.size:
+                    self._conns.append(_connect(self.path))
+                    self._locks.append(threading.Lock())
+                slot = self._assigned % len(self._conns)
+                self._assigned += 1
+            self._local.slot = slot
+        return self._conns[slot], self._locks[slot]
+
+    def close(self) -> None:
+        """Checkpoint the WAL into the DB and close every connection (waits for in-flight cursors)."""
+        with self._guard:
+            if self._closed:
+                return
+            self._closed = True
+            for i, (conn, lock) in enumerate(zip(self._conns, self._locks)):
+                with lock:
+                    if i == 0:
+                        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                    conn.close()
+            self._conns.clear()
+            self._locks.clear()
+
+
+class PooledSqliteSaver(SqliteSaver):
+    """SqliteSaver that uses the calling thread's pooled connection instead of one shared connection."""
+
+    def __init__(self, pool: SqliteConnectionPool, **kwargs):
+        self.pool = pool
+        # Called with the thread_id after each checkpoint write (e.g. to wake /state/stream)
+        self.on_put: list[Callable[[str], None]] = []
+        super().__init__(pool.get()[0], **kwargs)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return self.pool.get()[0]
+
+    @conn.setter
+    def conn(self, value: sqlite3.Connection) -> None:
+        # Connections are owned by the pool; SqliteSaver.__init__ assigns one we already hold.
+        pass
+
+    @contextmanager
+    def cursor(self, transaction: bool = True) -> Iterator[sqlite3.Cursor]:
+        """Cursor on this thread's connection; only threads sharing a pool slot serialize."""
+        conn, lock = self.pool.get()
+        with lock:
+            self.setup()
+            cur = conn.cursor()
+            try:
+                yield cur
+            finally:
+                if transaction:
+                    conn.commit()
+                cur.close()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = config["configurable"]["thread_id"]
+        for callback in self.on_put:
+            callback(thread_id)
+        return next_config
 
 
 def get_checkpointer(db_path: Path | str | None = None) -> SqliteSaver:
-    """Return a SqliteSaver checkpointer. Creates DB dir if needed."""
+    """Return a pooled SqliteSaver checkpointer. Creates DB dir if needed."""
     path = Path(db_path or DEFAULT_DB_PATH)
     path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(path), check_same_thread=False)
-    return SqliteSaver(conn)
+    return PooledSqliteSaver(SqliteConnectionPool(path))
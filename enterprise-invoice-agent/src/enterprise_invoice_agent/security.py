@@ -1,19 +1,71 @@
 """Security: PII filtering for logs and API responses."""
 
+import json
+import re
+from collections import deque
 from typing import Any
 
 from .config import PII_KEYS
 
 REDACT_PLACEHOLDER = "[REDACTED]"
 
+# One pass over a string tells us whether any PII key could be embedded in it
+_PII_SCAN = re.compile("|".join(map(re.escape, sorted(PII_KEYS))))
 
-def redact_pii(obj: Any) -> Any:
-    """Recursively redact known PII keys from dicts/lists. Used for logs and responses."""
-    if isinstance(obj, dict):
-        return {
-            k: REDACT_PLACEHOLDER if k in PII_KEYS else redact_pii(v)
-            for k, v in obj.items()
-        }
-    if isinstance(obj, list):
-        return [redact_pii(item) for item in obj]
-    return obj
+
+def redact_pii(obj: Any, in_place: bool = False, skip_none: bool = False) -> Any:
+    """
+    Redact known PII keys from nested dicts/lists. Used for logs and responses.
+    Walks with an explicit worklist (no recursion limit). By default containers are copied;
+    pass in_place=True when the caller owns obj (e.g. a freshly built response) to skip the copies.
+    skip_none=True also drops top-level keys whose value is None (unset state channels).
+    """
+    if isinstance(obj, str):
+        return _redact_json_blob(obj)
+    if not isinstance(obj, (dict, list)):
+        return obj
+    if skip_none and isinstance(obj, dict):
+        if in_place:
+            for key in [k for k, v in obj.items() if v is None]:
+                del obj[key]
+            root = obj
+        else:
+            root = {k: v for k, v in obj.items() if v is not None}
+    else:
+        root = obj if in_place else _shallow_copy(obj)
+    pending = deque([root])
+    while pending:
+        node = pending.pop()
+        if isinstance(node, dict):
+            if not PII_KEYS.isdisjoint(node):
+                for key in PII_KEYS.intersection(node):
+                    node[key] = REDACT_PLACEHOLDER
+            items = node.items()
+        else:
+            items = enumerate(node)
+        for key, value in items:
+            if isinstance(value, (dict, list)):
+                if not in_place:
+                    value = _shallow_copy(value)
+                    node[key] = value
+                pending.append(value)
+            elif isinstance(value, str):
+                redacted = _redact_json_blob(value)
+                if redacted is not value:
+                    node[key] = redacted
+    return root
+
+
+def _redact_json_blob(text: str) -> str:
+    """Redact PII inside JSON-in-a-string (e.g. tool output in messages). Non-JSON text is returned as is."""
+    if not text.startswith(("{", "[")) or not _PII_SCAN.search(text):
+        return text
+    try:
+        parsed = json.loads(text)
+    except ValueError:
+        return text
+    return json.dumps(redact_pii(parsed, in_place=True))
+
+
+def _shallow_copy(container: dict | list) -> dict | list:
+    return dict(container) if isinstance(container, dict) else list(container)
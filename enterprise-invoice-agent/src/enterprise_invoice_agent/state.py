@@ -1,16 +1,26 @@
 """LangGraph state for invoice reconciliation workflow."""
 
+from collections import deque
 from decimal import Decimal
 from typing import Annotated, Literal, Optional, TypedDict
 
-from operator import add
+from .config import MAX_STATE_MESSAGES
+
+
+def bounded_append(old: list, new: list) -> list:
+    """Reducer for messages: append, keeping only the last MAX_STATE_MESSAGES so checkpoints stay bounded."""
+    if len(old) + len(new) <= MAX_STATE_MESSAGES:
+        return old + new
+    window = deque(old, maxlen=MAX_STATE_MESSAGES)
+    window.extend(new)
+    return list(window)
 
 
 class InvoiceReconciliationState(TypedDict, total=False):
     """State for the reconciliation graph. Persisted by checkpointer."""
 
     # Input
-    messages: Annotated[list, add]
+    messages: Annotated[list, bounded_append]
     vendor_id: Optional[str]
 
     # Worker output
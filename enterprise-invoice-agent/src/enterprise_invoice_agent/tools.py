@@ -3,12 +3,16 @@
 import random
 import time
 from decimal import Decimal
-from typing import Optional
+from typing import NamedTuple, Optional
 
 from pydantic import BaseModel, Field
 
 from .config import HITL_APPROVAL_THRESHOLD_USD
-from .models import Invoice, PurchaseOrder, ReconciliationResult
+from .models import ReconciliationResult
+
+# Decimal constants built once, not per call
+_CENT_TOLERANCE = Decimal("0.01")
+_THRESHOLD_DEC = Decimal(str(HITL_APPROVAL_THRESHOLD_USD))
 
 # ---- Tool input schemas (type-safe tool calling) ----
 
@@ -37,49 +41,62 @@ class GetPaymentDetailsInput(BaseModel):
 # ---- Mock data (replace with real API in production) ----
 
 
-def _mock_invoices(vendor_id: Optional[str] = None, limit: int = 10) -> list[Invoice]:
+class _InvoiceRow(NamedTuple):
+    """Static invoice fixture; same fields as models.Invoice, without per-instance validation."""
+
+    invoice_id: str
+    vendor_id: str
+    vendor_name: str
+    amount: Decimal
+    currency: str = "USD"
+    due_date: Optional[str] = None
+    line_items: tuple = ()
+    status: str = "pending"
+
+
+class _PurchaseOrderRow(NamedTuple):
+    """Static PO fixture; same fields as models.PurchaseOrder."""
+
+    po_id: str
+    vendor_id: str
+    total_amount: Decimal
+    status: str = "open"
+    line_items: tuple = ()
+
+
+_INVOICES: tuple[_InvoiceRow, ...] = (
+    _InvoiceRow("INV-001", "V001", "Acme Corp", Decimal("10000.00")),
+    _InvoiceRow("INV-002", "V001", "Acme Corp", Decimal("500.00")),
+    _InvoiceRow("INV-003", "V002", "Beta Inc", Decimal("2500.00")),
+)
+
+_PURCHASE_ORDERS: tuple[_PurchaseOrderRow, ...] = (
+    _PurchaseOrderRow("PO-101", "V001", Decimal("10000.00")),
+    _PurchaseOrderRow("PO-102", "V001", Decimal("500.00")),
+    _PurchaseOrderRow("PO-201", "V002", Decimal("2500.00")),
+)
+
+# Keyed lookups instead of scans (a single keyed RPC against a real backend)
+_INVOICE_INDEX: dict[str, _InvoiceRow] = {i.invoice_id: i for i in _INVOICES}
+_PO_INDEX: dict[str, _PurchaseOrderRow] = {p.po_id: p for p in _PURCHASE_ORDERS}
+
+
+def _mock_invoices(vendor_id: Optional[str] = None, limit: int = 10) -> list[_InvoiceRow]:
     """Simulate ERP API: fetch pending invoices. Raises on simulated timeout."""
     # Simulate occasional timeout (for self-correction demo)
     if random.random() < 0.15:
         raise TimeoutError("ERP API timeout")
-    items = [
-        Invoice(
-            invoice_id="INV-001",
-            vendor_id="V001",
-            vendor_name="Acme Corp",
-            amount=Decimal("10000.00"),
-            currency="USD",
-            status="pending",
-        ),
-        Invoice(
-            invoice_id="INV-002",
-            vendor_id="V001",
-            vendor_name="Acme Corp",
-            amount=Decimal("500.00"),
-            currency="USD",
-            status="pending",
-        ),
-        Invoice(
-            invoice_id="INV-003",
-            vendor_id="V002",
-            vendor_name="Beta Inc",
-            amount=Decimal("2500.00"),
-            currency="USD",
-            status="pending",
-        ),
-    ]
+    items = _INVOICES
     if vendor_id:
         items = [i for i in items if i.vendor_id == vendor_id]
-    return items[:limit]
+    return list(items[:limit])
 
 
-def _mock_pos() -> list[PurchaseOrder]:
-    """Simulate PO system."""
-    return [
-        PurchaseOrder(po_id="PO-101", vendor_id="V001", total_amount=Decimal("10000.00"), status="open"),
-        PurchaseOrder(po_id="PO-102", vendor_id="V001", total_amount=Decimal("500.00"), status="open"),
-        PurchaseOrder(po_id="PO-201", vendor_id="V002", total_amount=Decimal("2500.00"), status="open"),
-    ]
+def _row_to_dict(row: NamedTuple) -> dict:
+    """API-boundary form of a fixture row (matches model_dump() of the Pydantic model)."""
+    out = row._asdict()
+    out["line_items"] = list(row.line_items)
+    return out
 
 
 # ---- Tools (Pydantic in/out; can be used by PydanticAI agent or wrapped for LangGraph) ----
@@ -88,15 +105,14 @@ def _mock_pos() -> list[PurchaseOrder]:
 def fetch_pending_invoices(args: FetchInvoicesInput) -> list[dict]:
     """Fetch pending invoices from ERP. Optional vendor filter."""
     invoices = _mock_invoices(vendor_id=args.vendor_id, limit=args.limit)
-    return [i.model_dump() for i in invoices]
+    return [_row_to_dict(i) for i in invoices]
 
 
 def match_invoice_to_po(args: MatchInvoiceInput) -> ReconciliationResult:
     """Match an invoice to a purchase order; returns match score and amount match."""
-    invoices = _mock_invoices(limit=100)
-    pos = _mock_pos()
-    inv = next((i for i in invoices if i.invoice_id == args.invoice_id), None)
-    po = next((p for p in pos if p.po_id == args.po_id), None)
+    # Lookup data, not an ERP fetch: no simulated timeout here
+    inv = _INVOICE_INDEX.get(args.invoice_id)
+    po = _PO_INDEX.get(args.po_id)
     if not inv or not po:
         return ReconciliationResult(
             invoice_id=args.invoice_id,
@@ -105,7 +121,7 @@ def match_invoice_to_po(args: MatchInvoiceInput) -> ReconciliationResult:
             amount_match=False,
             message="Invoice or PO not found",
         )
-    amount_match = abs(inv.amount - po.total_amount) < Decimal("0.01")
+    amount_match = abs(inv.amount - po.total_amount) < _CENT_TOLERANCE
     score = 1.0 if (inv.vendor_id == po.vendor_id and amount_match) else 0.5
     return ReconciliationResult(
         invoice_id=args.invoice_id,
@@ -122,7 +138,7 @@ def get_payment_details(invoice_id: str, amount_usd: Decimal) -> dict:
         "invoice_id": invoice_id,
         "amount_usd": str(amount_usd),
         "currency": "USD",
-        "requires_approval": float(amount_usd) >= HITL_APPROVAL_THRESHOLD_USD,
+        "requires_approval": amount_usd >= _THRESHOLD_DEC,
         "approval_threshold_usd": HITL_APPROVAL_THRESHOLD_USD,
     }
 
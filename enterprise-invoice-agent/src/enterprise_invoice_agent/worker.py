@@ -1,5 +1,6 @@
 """Worker: type-safe tool execution (PydanticAI-style tools) with self-correction wrapper."""
 
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 
 from .config import MAX_TOOL_RETRIES
@@ -12,6 +13,12 @@ from .tools import (
 )
 from .models import ReconciliationResult
 
+# Transient tool failures worth retrying (simulated ERP timeouts, dropped connections)
+RETRYABLE_ERRORS = (TimeoutError, ConnectionError)
+
+# Upper bound on concurrent match_invoice_to_po calls per reconcile step
+MAX_MATCH_WORKERS = 8
+
 
 def run_fetch_invoices(vendor_id: str | None = None, limit: int = 10) -> list[dict]:
     """Call fetch_pending_invoices with type-safe input. Used by graph with retry."""
@@ -25,23 +32,39 @@ def run_match_invoice(invoice_id: str, po_id: str) -> ReconciliationResult:
     return match_invoice_to_po(inp)
 
 
-def run_with_retry_and_fallback(fn, *args, fallback_result=None, max_retries: int = MAX_TOOL_RETRIES, **kwargs):
+def run_with_retry_and_fallback(
+    fn, *args, fallback_result=None, max_retries: int = MAX_TOOL_RETRIES, retry_on=RETRYABLE_ERRORS, **kwargs
+):
     """
     Self-correction loop: retry on failure, then return fallback if all retries fail.
+    Only exceptions in retry_on are retried; anything else is a bug and propagates.
     Returns (result, error, used_fallback).
     """
-    last_error = None
-    for attempt in range(max_retries):
+    try:
+        return fn(*args, **kwargs), None, False
+    except retry_on as e:
+        last_error = e
+    for _ in range(max_retries - 1):
         try:
-            result = fn(*args, **kwargs)
-            return result, None, False
-        except Exception as e:
+            return fn(*args, **kwargs), None, False
+        except retry_on as e:
             last_error = e
-            if attempt == max_retries - 1:
-                return fallback_result, last_error, True
     return fallback_result, last_error, True
 
 
+def _reconcile_invoice(inv: dict) -> dict:
+    """Match one fetched invoice to its PO; errors are recorded on the item, not raised."""
+    inv_id = inv.get("invoice_id", "")
+    # Match to a default PO for demo (in production, worker or LLM would pick PO)
+    vid = inv.get("vendor_id") or ""
+    po_id = "PO-101" if vid == "V001" else ("PO-201" if vid == "V002" else "PO-101")
+    try:
+        match = run_match_invoice(inv_id, po_id)
+        return {"invoice": inv, "match": match.model_dump()}
+    except Exception as e:
+        return {"invoice": inv, "match": None, "error": str(e)}
+
+
 def reconcile_step(vendor_id: str | None, limit: int = 5) -> tuple[list[dict], Exception | None, bool]:
     """
     One reconciliation step: fetch invoices with retry/fallback, then match first to a PO.
@@ -53,17 +76,12 @@ def reconcile_step(vendor_id: str | None, limit: int = 5) -> tuple[list[dict], E
     )
     if err:
         return [], err, used_fallback
-    reconciled = []
-    for inv in (invoices or [])[:3]:
-        inv_id = inv.get("invoice_id", "")
-        # Match to a default PO for demo (in production, worker or LLM would pick PO)
-        vid = inv.get("vendor_id") or ""
-        po_id = "PO-101" if vid == "V001" else ("PO-201" if vid == "V002" else "PO-101")
-        try:
-            match = run_match_invoice(inv_id, po_id)
-            reconciled.append({"invoice": inv, "match": match.model_dump()})
-        except Exception as e:
-            reconciled.append({"invoice": inv, "match": None, "error": str(e)})
+    batch = (invoices or [])[:3]
+    if not batch:
+        return [], None, used_fallback
+    # Matches are independent I/O-bound calls; LangGraph won't fan out inside a node, so do it here
+    with ThreadPoolExecutor(max_workers=min(len(batch), MAX_MATCH_WORKERS)) as pool:
+        reconciled = list(pool.map(_reconcile_invoice, batch))
     return reconciled, None, used_fallback
 
 
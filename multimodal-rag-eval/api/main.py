@@ -56,9 +56,15 @@ def get_rag() -> HybridRAGPipeline:
             chroma_persist_dir=settings.chroma_persist_dir,
             llm_model=settings.llm_model,
             embedding_model=settings.embedding_model,
+            embedding_dim=settings.embedding_dim,
             chunk_size=settings.chunk_size,
             chunk_overlap=settings.chunk_overlap,
             top_k=settings.top_k_retrieval,
+            embedding_precision=settings.embedding_precision,
+            quantized_search=settings.quantized_search,
+            bm25_numba=settings.bm25_numba,
+            chroma_server_host=settings.chroma_server_host or None,
+            chroma_server_port=settings.chroma_server_port,
         )
     return _rag
 
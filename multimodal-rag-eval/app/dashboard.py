@@ -4,9 +4,14 @@ Shows per-query evaluation metrics for RAG responses.
 Target: Architect / Principal Engineer demos.
 """
 
+import asyncio
+import hashlib
 import os
 import sys
+from collections import deque
+from itertools import islice
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -14,55 +19,168 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 import streamlit as st
 
 from config import get_settings, ensure_dirs
-from src.rag.hybrid_rag import HybridRAGPipeline
-from src.evaluation.ragas_evaluator import RagasEvaluator
+
+# Evaluations kept per session, and how many the history tab renders per page ("Show more" adds one)
+EVAL_HISTORY_MAX = 200
+EVAL_HISTORY_SHOWN = 50
+
+# File (in chroma_persist_dir) listing the content hashes already ingested
+INGEST_LEDGER = ".ingested"
+
+if TYPE_CHECKING:
+    from src.evaluation.ragas_evaluator import RagasEvaluator
+    from src.rag.hybrid_rag import HybridRAGPipeline
 
 
 def init_session_state():
     """Initialize session state for evaluation history."""
     if "eval_history" not in st.session_state:
-        st.session_state.eval_history = []
-    if "rag" not in st.session_state:
-        st.session_state.rag = None
-    if "evaluator" not in st.session_state:
-        st.session_state.evaluator = None
+        st.session_state.eval_history = deque(maxlen=EVAL_HISTORY_MAX)
+    if "pending_evals" not in st.session_state:
+        st.session_state.pending_evals = []
+    if "history_shown" not in st.session_state:
+        st.session_state.history_shown = EVAL_HISTORY_SHOWN
+
+
+def show_more_history() -> None:
+    """Render one more page of evaluation history on the next rerun."""
+    st.session_state.history_shown += EVAL_HISTORY_SHOWN
+
+
+def record_eval(eval_result) -> None:
+    """Add an evaluation to the session history (newest first)."""
+    st.session_state.eval_history.appendleft({
+        "question": eval_result.question,
+        "answer": eval_result.answer,
+        "faithfulness": eval_result.faithfulness,
+        "answer_relevancy": eval_result.answer_relevancy,
+    })
+
+
+def render_eval(item: dict) -> None:
+    """Render one evaluation history entry."""
+    with st.container():
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            st.markdown(f"**Q:** {item['question']}")
+        with col2:
+            st.metric("Faithfulness", f"{item['faithfulness']:.2%}")
+        with col3:
+            st.metric("Relevancy", f"{item['answer_relevancy']:.2%}")
+        st.markdown(f"**A:** {item['answer'][:200]}...")
+        st.divider()
+
+
+def ingest_ledger(settings) -> Path:
+    """Hashes of ingested content, kept inside chroma_persist_dir so it is wiped or moved with the index."""
+    return Path(settings.chroma_persist_dir) / INGEST_LEDGER
+
+
+def ingested_hashes(ledger: Path) -> set[str]:
+    """Content hashes already in the index (read from disk, so other sessions' ingests count too)."""
+    return set(ledger.read_text().split()) if ledger.exists() else set()
+
+
+def mark_ingested(ledger: Path, hashes: list[str]) -> None:
+    """Record content hashes whose chunks were added to the index."""
+    if not hashes:
+        return
+    with open(ledger, "a") as f:
+        f.write("".join(f"{h}\n" for h in hashes))
+
+
+async def save_uploads(files: list, uploads_dir: Path) -> None:
+    """Write uploaded files to uploads_dir concurrently."""
+    import aiofiles
+
+    async def save(f) -> None:
+        async with aiofiles.open(uploads_dir / f.name, "wb") as out:
+            await out.write(f.getbuffer())
+
+    await asyncio.gather(*(save(f) for f in files))
+
+
+@st.cache_resource(show_spinner=False, ttl=None)
+def _build_rag(
+    persist_dir: str,
+    llm_model: str,
+    embed_model: str,
+    embedding_dim: Optional[int],
+    chunk_size: int,
+    chunk_overlap: int,
+    top_k: int,
+    embedding_precision: str,
+    quantized_search: bool,
+    bm25_numba: bool,
+    chroma_server_host: str,
+    chroma_server_port: int,
+) -> "HybridRAGPipeline":
+    """One pipeline (Chroma client, embedder, LLM) per process, shared by all sessions."""
+    # Imported here so the LlamaIndex/Chroma stack loads on first use, not on page load
+    from src.rag.hybrid_rag import HybridRAGPipeline
+
+    return HybridRAGPipeline(
+        chroma_persist_dir=persist_dir,
+        llm_model=llm_model,
+        embedding_model=embed_model,
+        embedding_dim=embedding_dim,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        top_k=top_k,
+        embedding_precision=embedding_precision,
+        quantized_search=quantized_search,
+        bm25_numba=bm25_numba,
+        chroma_server_host=chroma_server_host or None,
+        chroma_server_port=chroma_server_port,
+    )
+
+
+@st.cache_resource(show_spinner=False, ttl=None)
+def _build_evaluator(model: str) -> "RagasEvaluator":
+    """One Ragas evaluator per process, shared by all sessions."""
+    # Ragas (and pandas/datasets behind it) is only needed once someone evaluates
+    from src.evaluation.ragas_evaluator import RagasEvaluator
+
+    return RagasEvaluator(model=model)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_query(_rag: "HybridRAGPipeline", query: str, top_k: int) -> dict:
+    """RAG answer cached on (query, top_k); cleared whenever this app ingests documents."""
+    return _rag.query(query, return_sources=True)
 
 
 def load_rag_pipeline():
     """Load or create RAG pipeline."""
-    if st.session_state.rag is not None:
-        return st.session_state.rag
-
     settings = get_settings()
     if not settings.openai_api_key:
         st.error("Set OPENAI_API_KEY in .env or environment")
         return None
 
     ensure_dirs(settings)
-    rag = HybridRAGPipeline(
-        chroma_persist_dir=settings.chroma_persist_dir,
-        llm_model=settings.llm_model,
-        embedding_model=settings.embedding_model,
-        chunk_size=settings.chunk_size,
-        chunk_overlap=settings.chunk_overlap,
-        top_k=settings.top_k_retrieval,
+    return _build_rag(
+        settings.chroma_persist_dir,
+        settings.llm_model,
+        settings.embedding_model,
+        settings.embedding_dim,
+        settings.chunk_size,
+        settings.chunk_overlap,
+        settings.top_k_retrieval,
+        settings.embedding_precision,
+        settings.quantized_search,
+        settings.bm25_numba,
+        settings.chroma_server_host,
+        settings.chroma_server_port,
     )
-    st.session_state.rag = rag
-    return rag
 
 
 def load_evaluator():
     """Load or create Ragas evaluator."""
-    if st.session_state.evaluator is not None:
-        return st.session_state.evaluator
-
     settings = get_settings()
     if not settings.openai_api_key:
         return None
 
-    evaluator = RagasEvaluator(model=settings.ragas_evaluator_model)
-    st.session_state.evaluator = evaluator
-    return evaluator
+    return _build_evaluator(settings.ragas_evaluator_model)
 
 
 def main():
@@ -109,6 +227,10 @@ def main():
             "Enter your question",
             placeholder="e.g., What are the key specifications in the technical document?",
         )
+        defer_eval = st.checkbox(
+            "Queue evaluation for a batch run",
+            help="Answer now and score later together with other queued queries (one Ragas run)",
+        )
 
         if st.button("Query & Evaluate", type="primary"):
             if not query.strip():
@@ -124,43 +246,56 @@ def main():
                         st.error("Failed to initialize RAG or Evaluator")
                     else:
                         try:
-                            result = rag.query(query, return_sources=True)
+                            result = _cached_query(rag, query, rag.top_k)
                             answer = result.get("answer", "")
                             contexts = result.get("retrieved_contexts", [])
 
                             if not contexts:
+                                # Nothing retrieved: scoring against a placeholder would just burn judge calls
+                                from src.evaluation.ragas_evaluator import EvaluationResult
+
                                 st.warning("No documents ingested. Add documents in the Ingest tab first.")
-                                st.info("Using sample context for evaluation demo.")
-                                contexts = ["Sample context: No documents loaded. Ingest PDFs to enable retrieval."]
-
-                            eval_result = evaluator.evaluate_single(
-                                question=query,
-                                answer=answer,
-                                retrieved_contexts=contexts,
-                            )
-
-                            # Store in history
-                            st.session_state.eval_history.insert(0, {
-                                "question": query,
-                                "answer": eval_result.answer,
-                                "faithfulness": eval_result.faithfulness,
-                                "answer_relevancy": eval_result.answer_relevancy,
-                            })
-
-                            # Display results
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                st.metric(
-                                    "Faithfulness",
-                                    f"{eval_result.faithfulness:.2%}",
-                                    help="Higher = less hallucination",
+                                st.info("Skipping evaluation — no retrieved contexts.")
+                                eval_result = EvaluationResult(
+                                    question=query,
+                                    answer=answer,
+                                    faithfulness=0.0,
+                                    answer_relevancy=0.0,
+                                    retrieved_contexts=[],
                                 )
-                            with col2:
-                                st.metric(
-                                    "Answer Relevancy",
-                                    f"{eval_result.answer_relevancy:.2%}",
-                                    help="Higher = more relevant to question",
+                            elif defer_eval:
+                                st.session_state.pending_evals.append({
+                                    "user_input": query,
+                                    "response": answer,
+                                    "retrieved_contexts": contexts,
+                                })
+                                st.info(
+                                    f"Queued for evaluation ({len(st.session_state.pending_evals)} pending)."
                                 )
+                                eval_result = None
+                            else:
+                                eval_result = evaluator.evaluate_single(
+                                    question=query,
+                                    answer=answer,
+                                    retrieved_contexts=contexts,
+                                )
+                                record_eval(eval_result)
+
+                            if eval_result is not None:
+                                # Display results
+                                col1, col2 = st.columns(2)
+                                with col1:
+                                    st.metric(
+                                        "Faithfulness",
+                                        f"{eval_result.faithfulness:.2%}",
+                                        help="Higher = less hallucination",
+                                    )
+                                with col2:
+                                    st.metric(
+                                        "Answer Relevancy",
+                                        f"{eval_result.answer_relevancy:.2%}",
+                                        help="Higher = more relevant to question",
+                                    )
 
                             st.subheader("Answer")
                             st.write(answer)
@@ -175,23 +310,39 @@ def main():
                             st.error(f"Error: {e}")
                             st.exception(e)
 
+        # Queued queries are scored together: one Ragas run instead of one per query
+        pending = st.session_state.pending_evals
+        if pending and st.button(f"Run pending evals ({len(pending)})"):
+            evaluator = load_evaluator()
+            if evaluator is None:
+                st.error("Failed to initialize Evaluator")
+            else:
+                with st.spinner(f"Evaluating {len(pending)} queries..."):
+                    try:
+                        results = evaluator.evaluate_batch(pending)
+                    except Exception as e:
+                        st.error(f"Error: {e}")
+                        st.exception(e)
+                    else:
+                        for eval_result in results:
+                            record_eval(eval_result)
+                        st.session_state.pending_evals = []
+                        st.success(f"Evaluated {len(results)} queries. See Evaluation History.")
+
     with tab2:
         st.subheader("Evaluation History")
 
         if not st.session_state.eval_history:
             st.info("No evaluations yet. Run a query in the first tab.")
         else:
-            for i, item in enumerate(st.session_state.eval_history):
-                with st.container():
-                    col1, col2, col3 = st.columns([2, 1, 1])
-                    with col1:
-                        st.markdown(f"**Q:** {item['question']}")
-                    with col2:
-                        st.metric("Faithfulness", f"{item['faithfulness']:.2%}")
-                    with col3:
-                        st.metric("Relevancy", f"{item['answer_relevancy']:.2%}")
-                    st.markdown(f"**A:** {item['answer'][:200]}...")
-                    st.divider()
+            history = st.session_state.eval_history
+            # Every rendered entry is rebuilt on each rerun (even inside a collapsed expander),
+            # so older entries are only rendered once asked for, a page at a time
+            shown = st.session_state.history_shown
+            for item in islice(history, 0, shown):
+                render_eval(item)
+            if len(history) > shown:
+                st.button(f"Show more ({len(history) - shown} older)", on_click=show_more_history)
 
     with tab3:
         st.subheader("Ingest Documents")
@@ -216,45 +367,63 @@ def main():
                 uploads_dir = Path(settings.uploads_dir)
                 uploads_dir.mkdir(parents=True, exist_ok=True)
 
+                # Skip files whose exact bytes were already ingested (re-uploads, reruns)
+                ledger = ingest_ledger(settings)
+                seen = ingested_hashes(ledger)
+                new_files, hash_by_path = [], {}
                 for f in uploaded_files:
-                    path = uploads_dir / f.name
-                    with open(path, "wb") as out:
-                        out.write(f.getbuffer())
-
-                st.success(f"Saved {len(uploaded_files)} files to {uploads_dir}")
-
-                # Parse and ingest
-                try:
-                    from src.parsers.unstructured_parser import UnstructuredPDFParser
-                except ImportError:
-                    from src.parsers.fallback_parser import FallbackPDFParser
-                    parser = FallbackPDFParser(
-                        chunk_size=settings.chunk_size,
-                        chunk_overlap=settings.chunk_overlap,
-                    )
-                else:
-                    parser = UnstructuredPDFParser(
-                        chunk_size=settings.chunk_size,
-                        chunk_overlap=settings.chunk_overlap,
-                    )
-
-                from llama_index.core import Document
-
-                all_docs = []
-                for f in uploaded_files:
-                    path = uploads_dir / f.name
-                    docs = parser.parse_file(path)
-                    all_docs.extend(docs)
+                    h = hashlib.sha256(f.getbuffer()).hexdigest()
+                    if h in seen or h in hash_by_path.values():
+                        continue
+                    new_files.append(f)
+                    hash_by_path[uploads_dir / f.name] = h
+
+                skipped = len(uploaded_files) - len(new_files)
+                if skipped:
+                    st.info(f"Skipped {skipped} already-ingested file(s)")
+
+                if new_files:
+                    asyncio.run(save_uploads(new_files, uploads_dir))
+
+                    st.success(f"Saved {len(new_files)} files to {uploads_dir}")
+
+                    # Parse and ingest
+                    try:
+                        from src.parsers.unstructured_parser import UnstructuredPDFParser
+                    except ImportError:
+                        from src.parsers.fallback_parser import FallbackPDFParser
+                        parser = FallbackPDFParser(
+                            chunk_size=settings.chunk_size,
+                            chunk_overlap=settings.chunk_overlap,
+                        )
+                    else:
+                        parser = UnstructuredPDFParser(
+                            chunk_size=settings.chunk_size,
+                            chunk_overlap=settings.chunk_overlap,
+                        )
 
-                if all_docs:
                     rag = load_rag_pipeline()
-                    if rag:
-                        rag.ingest_documents(all_docs)
-                        st.success(f"Ingested {len(all_docs)} chunks from {len(uploaded_files)} PDFs")
-                    else:
+                    if not rag:
                         st.error("Failed to load RAG pipeline")
-                else:
-                    st.warning("No content extracted from PDFs")
+                    else:
+                        # Index each file as soon as it's parsed; only one file's chunks are held at a time
+                        n_chunks, n_files = 0, 0
+                        for result in parser.iter_parse_files(hash_by_path):
+                            if result.error is not None:
+                                st.error(f"Failed to parse {result.path.name}: {result.error}")
+                            elif result.nodes:
+                                rag.ingest_nodes(result.nodes)
+                                # Only files that reached the index are skipped next time
+                                mark_ingested(ledger, [hash_by_path[result.path]])
+                                n_chunks += len(result.nodes)
+                                n_files += 1
+                            del result
+
+                        if n_chunks:
+                            _cached_query.clear()
+                            st.success(f"Ingested {n_chunks} chunks from {n_files} PDFs")
+                        else:
+                            st.warning("No content extracted from PDFs")
 
         # Sample data option
         st.divider()
@@ -278,13 +447,21 @@ def main():
             - Transaction latency: < 200ms p95
             - Compliance: PCI-DSS Level 1
             """
-            docs = [Document(text=sample_text, metadata={"source": "sample"})]
+            settings = get_settings()
+            ensure_dirs(settings)
+            ledger = ingest_ledger(settings)
+            sample_hash = hashlib.sha256(sample_text.encode()).hexdigest()
             rag = load_rag_pipeline()
-            if rag:
+            if not rag:
+                st.error("Set OPENAI_API_KEY first")
+            elif sample_hash in ingested_hashes(ledger):
+                st.info("Sample document is already loaded. Try querying: 'What are the system specifications?'")
+            else:
+                docs = [Document(text=sample_text, metadata={"source": "sample"})]
                 rag.ingest_documents(docs)
+                mark_ingested(ledger, [sample_hash])
+                _cached_query.clear()
                 st.success("Loaded sample technical document. Try querying: 'What are the system specifications?'")
-            else:
-                st.error("Set OPENAI_API_KEY first")
 
 
 if __name__ == "__main__":
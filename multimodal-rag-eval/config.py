@@ -1,6 +1,7 @@
 """Configuration for Multimodal RAG with Evaluation."""
 
 from pathlib import Path
+from typing import Literal, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -16,10 +17,30 @@ class Settings(BaseSettings):
     data_dir: str = "./data"
     uploads_dir: str = "./data/uploads"
 
+    # Chroma server (client-server mode); leave host empty to use the embedded store in chroma_persist_dir.
+    # The docstore and BM25 index are still files in chroma_persist_dir, so every worker using the
+    # server must point chroma_persist_dir at the same shared directory; ingest from one process at a time
+    chroma_server_host: str = ""
+    chroma_server_port: int = 8000
+
     # Models
     llm_model: str = "gpt-4o-mini"
     embedding_model: str = "text-embedding-3-small"
+    # Output size requested from text-embedding-3 models; unset keeps the model's native size (1536).
+    # 512 cuts vector storage and search cost ~3x. Changing it on an existing store re-embeds the whole
+    # corpus from the docstore (at API cost) on first open; collections the docstore can't rebuild
+    # (e.g. ingested before it existed) fail to open instead - leave it unset for those or re-ingest
+    embedding_dim: Optional[int] = None
     ragas_evaluator_model: str = "gpt-4o-mini"
+    # Precision of the in-process query-embedding cache only (at most cache_size question vectors):
+    # "int8" stores them ~4x smaller and searches with the dequantized vector. The corpus vectors
+    # in Chroma are always float32 (see quantized_search for a compact corpus scan)
+    embedding_precision: Literal["fp32", "int8"] = "fp32"
+    # Dense search over a uint8 scalar-quantized copy of the embeddings, re-ranked in float32
+    quantized_search: bool = False
+    # Score BM25 with numba-compiled kernels (needs numba). The JIT compile adds ~7s to each process's
+    # first BM25 query, so only enable it for large corpora in long-running servers
+    bm25_numba: bool = False
 
     # RAG Settings
     chunk_size: int = 512
@@ -8,12 +8,13 @@ Usage:
 import os
 import sys
 from pathlib import Path
+from typing import Iterator
 
 # Add project root
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from config import get_settings, ensure_dirs
-from llama_index.core import Document
+from llama_index.core.schema import TextNode
 from src.rag.hybrid_rag import HybridRAGPipeline
 
 try:
@@ -41,41 +42,60 @@ def main():
 
     ensure_dirs(settings)
 
-    # For PDFs use Unstructured/Fallback; for txt use SimpleDirectoryReader
-    if path.suffix.lower() == ".pdf":
-        parser = PARSER_CLS(
-            chunk_size=settings.chunk_size,
-            chunk_overlap=settings.chunk_overlap,
-        )
-        if path.is_file():
-            docs = parser.parse_file(path)
-        else:
-            docs = parser.parse_directory(path)
-    else:
-        # Text/markdown - use SimpleDirectoryReader
-        from llama_index.core import SimpleDirectoryReader
-        from llama_index.core.node_parser import SentenceSplitter
-        reader = SimpleDirectoryReader(input_files=[str(path)] if path.is_file() else str(path))
-        raw_docs = reader.load_data()
-        splitter = SentenceSplitter(chunk_size=settings.chunk_size, chunk_overlap=settings.chunk_overlap)
-        nodes = splitter.get_nodes_from_documents(raw_docs)
-        docs = [Document(text=n.text, metadata=n.metadata) for n in nodes]
-
-    if not docs:
-        print("No documents extracted. Check file format.")
-        sys.exit(1)
-
     rag = HybridRAGPipeline(
         chroma_persist_dir=settings.chroma_persist_dir,
         llm_model=settings.llm_model,
         embedding_model=settings.embedding_model,
+        embedding_dim=settings.embedding_dim,
         chunk_size=settings.chunk_size,
         chunk_overlap=settings.chunk_overlap,
         top_k=settings.top_k_retrieval,
+        embedding_precision=settings.embedding_precision,
+        quantized_search=settings.quantized_search,
+        bm25_numba=settings.bm25_numba,
+        chroma_server_host=settings.chroma_server_host or None,
+        chroma_server_port=settings.chroma_server_port,
     )
 
-    rag.ingest_documents(docs)
-    print(f"Ingested {len(docs)} chunks from {path}")
+    # Ingest file by file so only one file's chunks are in memory at a time
+    n_chunks = 0
+    for nodes in iter_file_nodes(path, settings):
+        if nodes:
+            rag.ingest_nodes(nodes)
+            n_chunks += len(nodes)
+        del nodes
+
+    if not n_chunks:
+        print("No documents extracted. Check file format.")
+        sys.exit(1)
+
+    print(f"Ingested {n_chunks} chunks from {path}")
+
+
+def iter_file_nodes(path: Path, settings) -> Iterator[list[TextNode]]:
+    """Yield chunk nodes per source file."""
+    # For PDFs use Unstructured/Fallback; for txt use SimpleDirectoryReader
+    if path.suffix.lower() == ".pdf":
+        parser = PARSER_CLS(
+            chunk_size=settings.chunk_size,
+            chunk_overlap=settings.chunk_overlap,
+        )
+        if path.is_file():
+            yield parser.parse_file(path)
+            return
+        for result in parser.iter_parse_files(path.glob("**/*.pdf")):
+            if result.error is not None:
+                print(f"Warning: Failed to parse {result.path}: {result.error}")
+            yield result.nodes
+        return
+
+    # Text/markdown - use SimpleDirectoryReader
+    from llama_index.core import SimpleDirectoryReader
+    from src.rag.token_splitter import TokenWindowSplitter
+    reader = SimpleDirectoryReader(input_files=[str(path)]) if path.is_file() else SimpleDirectoryReader(str(path))
+    splitter = TokenWindowSplitter(chunk_size=settings.chunk_size, chunk_overlap=settings.chunk_overlap)
+    for raw_docs in reader.iter_data():
+        yield splitter.get_nodes_from_documents(raw_docs)
 
 
 if __name__ == "__main__":
@@ -5,26 +5,79 @@ Measures hallucination rates and answer quality:
 - Answer Relevancy: Does the answer directly address the user's question?
 """
 
+import asyncio
+import json
 import os
+import tempfile
+import time
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
-try:
-    from ragas import evaluate
-    from ragas.metrics import Faithfulness, AnswerRelevancy
-    from ragas import EvaluationDataset
-    from langchain_openai import ChatOpenAI
+# ragas / langchain_openai pull in pandas, datasets and numpy; _lazy_import() loads them
+# on first RagasEvaluator construction so importing this module stays cheap.
+evaluate = Faithfulness = AnswerRelevancy = EvaluationDataset = RunConfig = ChatOpenAI = None
+aevaluate = LangchainLLMWrapper = None
+_USE_LLM_WRAPPER = False
+
+
+@lru_cache(maxsize=None)
+def _lazy_import() -> bool:
+    """Import Ragas and its LLM client into module scope; return whether they are available."""
+    global evaluate, Faithfulness, AnswerRelevancy, EvaluationDataset, RunConfig, ChatOpenAI
+    global aevaluate, LangchainLLMWrapper, _USE_LLM_WRAPPER
+    try:
+        from ragas import evaluate
+        from ragas.metrics import Faithfulness, AnswerRelevancy
+        from ragas import EvaluationDataset
+        from ragas.run_config import RunConfig
+        from langchain_openai import ChatOpenAI
+    except ImportError:
+        return False
+    try:
+        from ragas import aevaluate
+    except ImportError:
+        aevaluate = None
     try:
         from ragas.llms import LangchainLLMWrapper
         _USE_LLM_WRAPPER = True
     except ImportError:
         LangchainLLMWrapper = None
         _USE_LLM_WRAPPER = False
-    HAS_RAGAS = True
-except ImportError:
-    HAS_RAGAS = False
-    LangchainLLMWrapper = None
-    _USE_LLM_WRAPPER = False
+    return True
+
+
+# Judge-call concurrency inside one Ragas run (shared by all samples and metrics), per-call
+# timeout in seconds, and samples per batch (10-20 suits gpt-4o-mini)
+EVAL_MAX_WORKERS = 16
+EVAL_TIMEOUT = 60
+EVAL_BATCH_SIZE = 16
+
+# Offline (OpenAI Batch API) judge prompts: one self-contained call per sample and metric,
+# following the Ragas rubrics. Each must answer with JSON {"score": <0..1>}.
+_OFFLINE_PROMPTS = {
+    "faithfulness": (
+        "Break the answer into its individual factual claims and check each against the context. "
+        "A claim is supported only if it can be directly inferred from the context.\n"
+        'Return JSON {{"score": supported_claims / total_claims}} (1.0 if the answer makes no claims).\n\n'
+        "Context:\n{contexts}\n\nAnswer:\n{response}"
+    ),
+    "answer_relevancy": (
+        "Rate how directly and completely the answer addresses the question, ignoring factual "
+        "correctness. Penalize evasive, noncommittal or off-topic content.\n"
+        'Return JSON {{"score": <float between 0 and 1>}}.\n\n'
+        "Question:\n{user_input}\n\nAnswer:\n{response}"
+    ),
+}
+_BATCH_DONE = {"completed", "failed", "expired", "cancelled"}
+
+
+def _loop_running() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
 
 
 @dataclass
@@ -46,7 +99,7 @@ class RagasEvaluator:
         model: str = "gpt-4o-mini",
         openai_api_key: Optional[str] = None,
     ):
-        if not HAS_RAGAS:
+        if not _lazy_import():
             raise ImportError(
                 "Install ragas: pip install ragas langchain-openai"
             )
@@ -55,8 +108,11 @@ class RagasEvaluator:
         if not api_key:
             raise ValueError("OPENAI_API_KEY must be set")
 
+        self._model = model
+        self._api_key = api_key
         self._llm = ChatOpenAI(model=model, api_key=api_key)
         self._evaluator_llm = LangchainLLMWrapper(self._llm) if _USE_LLM_WRAPPER else self._llm
+        self._run_config = RunConfig(max_workers=EVAL_MAX_WORKERS, timeout=EVAL_TIMEOUT)
 
     def evaluate_single(
         self,
@@ -64,72 +120,149 @@ class RagasEvaluator:
         answer: str,
         retrieved_contexts: list[str],
     ) -> EvaluationResult:
-        """Evaluate a single query-response pair."""
-        # Ragas expects retrieved_contexts as list of strings per sample
-        data = [{
+        """Evaluate a single query-response pair (a one-item batch)."""
+        return self.evaluate_batch([{
             "user_input": question,
             "retrieved_contexts": retrieved_contexts,
             "response": answer,
-        }]
-        dataset = EvaluationDataset.from_list(data)
+        }])[0]
+
+    def evaluate_batch(
+        self,
+        data: list[dict],
+        offline: bool = False,
+    ) -> list[EvaluationResult] | str:
+        """Evaluate a batch of query-response pairs in one Ragas run.
+
+        Each item in data should have: user_input, response, retrieved_contexts
+        Judge calls for all samples and metrics run concurrently inside evaluate().
+        With offline=True, submits an OpenAI Batch API job instead and returns its id
+        (see evaluate_batch_offline / poll_and_parse).
+        """
+        if offline:
+            return self.evaluate_batch_offline(data)
+        if not data:
+            return []
+        result = self._run(data)
+
+        # Per-sample scores as plain dicts (no DataFrame needed for two floats per row)
+        if hasattr(result, "scores"):
+            rows = result.scores
+        elif len(data) == 1:
+            rows = [result]  # aggregate scores are the sample's scores
+        else:
+            return [r for item in data for r in self.evaluate_batch([item])]
 
-        eval_kwargs = {"dataset": dataset, "metrics": [Faithfulness(), AnswerRelevancy()]}
+        results = []
+        for item, row in zip(data, rows):
+            results.append(EvaluationResult(
+                question=item.get("user_input", ""),
+                answer=item.get("response", ""),
+                faithfulness=float(row.get("faithfulness", 0.0)),
+                answer_relevancy=float(row.get("answer_relevancy", 0.0)),
+                retrieved_contexts=item.get("retrieved_contexts", []),
+            ))
+        return results
+
+    def _run(self, data: list[dict]):
+        """One Ragas run over data; both metrics' judge calls are dispatched concurrently."""
+        eval_kwargs = {
+            "dataset": EvaluationDataset.from_list(data),
+            "metrics": [Faithfulness(), AnswerRelevancy()],
+            "run_config": self._run_config,
+            "batch_size": EVAL_BATCH_SIZE,
+        }
         if self._evaluator_llm is not None:
             eval_kwargs["llm"] = self._evaluator_llm
-        result = evaluate(**eval_kwargs)
 
-        # Handle both dict and Result object
-        if hasattr(result, "to_pandas"):
-            df = result.to_pandas()
-            faithfulness = float(df["faithfulness"].iloc[0]) if "faithfulness" in df.columns else 0.0
-            answer_relevancy = float(df["answer_relevancy"].iloc[0]) if "answer_relevancy" in df.columns else 0.0
-        else:
-            faithfulness = float(result.get("faithfulness", 0.0))
-            answer_relevancy = float(result.get("answer_relevancy", 0.0))
-
-        return EvaluationResult(
-            question=question,
-            answer=answer,
-            faithfulness=faithfulness,
-            answer_relevancy=answer_relevancy,
-            retrieved_contexts=retrieved_contexts,
+        # Await aevaluate directly when we own the thread (Streamlit script, API worker thread);
+        # inside a running loop fall back to evaluate(), which nests via nest_asyncio
+        if aevaluate is not None and not _loop_running():
+            return asyncio.run(aevaluate(**eval_kwargs))
+        return evaluate(**eval_kwargs)
+
+    def evaluate_batch_offline(self, data: list[dict]) -> str:
+        """Submit judge prompts for all samples as an OpenAI Batch API job; return the batch id.
+
+        For nightly/regression runs: the Batch API costs half as much and has no per-request
+        rate limits, at the price of up to 24h latency. Collect results with poll_and_parse.
+        """
+        from openai import OpenAI
+
+        client = OpenAI(api_key=self._api_key)
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False, encoding="utf-8") as f:
+            for i, item in enumerate(data):
+                fields = {
+                    "user_input": item.get("user_input", ""),
+                    "response": item.get("response", ""),
+                    "contexts": "\n\n".join(item.get("retrieved_contexts", [])),
+                }
+                for metric, template in _OFFLINE_PROMPTS.items():
+                    f.write(json.dumps({
+                        "custom_id": f"{i}:{metric}",
+                        "method": "POST",
+                        "url": "/v1/chat/completions",
+                        "body": {
+                            "model": self._model,
+                            "temperature": 0,
+                            "response_format": {"type": "json_object"},
+                            "messages": [{"role": "user", "content": template.format(**fields)}],
+                        },
+                    }) + "\n")
+            jsonl_path = f.name
+
+        try:
+            with open(jsonl_path, "rb") as f:
+                input_file = client.files.create(file=f, purpose="batch")
+        finally:
+            os.unlink(jsonl_path)
+
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
         )
+        return batch.id
 
-    def evaluate_batch(
+    def poll_and_parse(
         self,
+        batch_id: str,
         data: list[dict],
+        poll_interval: float = 60.0,
     ) -> list[EvaluationResult]:
-        """Evaluate a batch of query-response pairs.
+        """Wait for an offline batch to finish and map its output back to EvaluationResults.
 
-        Each item in data should have: user_input, response, retrieved_contexts
+        data must be the same list passed to evaluate_batch_offline (custom ids are indices).
+        Samples whose judge call failed score 0.0.
         """
-        dataset = EvaluationDataset.from_list(data)
-        eval_kwargs = {"dataset": dataset, "metrics": [Faithfulness(), AnswerRelevancy()]}
-        if self._evaluator_llm is not None:
-            eval_kwargs["llm"] = self._evaluator_llm
-        result = evaluate(**eval_kwargs)
+        from openai import OpenAI
 
-        # Ragas returns per-sample scores in result
-        results = []
-        if hasattr(result, "to_pandas"):
-            df = result.to_pandas()
-            for i, row in df.iterrows():
-                item = data[i] if i < len(data) else {}
-                results.append(EvaluationResult(
-                    question=item.get("user_input", ""),
-                    answer=item.get("response", ""),
-                    faithfulness=float(row.get("faithfulness", 0.0)),
-                    answer_relevancy=float(row.get("answer_relevancy", 0.0)),
-                    retrieved_contexts=item.get("retrieved_contexts", []),
-                ))
-        else:
-            # Fallback: run single evaluations
-            for item in data:
-                single = self.evaluate_single(
-                    question=item["user_input"],
-                    answer=item["response"],
-                    retrieved_contexts=item["retrieved_contexts"],
-                )
-                results.append(single)
+        client = OpenAI(api_key=self._api_key)
+        batch = client.batches.retrieve(batch_id)
+        while batch.status not in _BATCH_DONE:
+            time.sleep(poll_interval)
+            batch = client.batches.retrieve(batch_id)
+        if batch.status != "completed" or not batch.output_file_id:
+            raise RuntimeError(f"Batch {batch_id} ended with status {batch.status}")
 
-        return results
+        scores: dict[str, float] = {}
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            try:
+                content = record["response"]["body"]["choices"][0]["message"]["content"]
+                scores[record["custom_id"]] = float(json.loads(content)["score"])
+            except (KeyError, IndexError, TypeError, ValueError):
+                continue
+
+        return [
+            EvaluationResult(
+                question=item.get("user_input", ""),
+                answer=item.get("response", ""),
+                faithfulness=scores.get(f"{i}:faithfulness", 0.0),
+                answer_relevancy=scores.get(f"{i}:answer_relevancy", 0.0),
+                retrieved_contexts=item.get("retrieved_contexts", []),
+            )
+            for i, item in enumerate(data)
+        ]
@@ -1,10 +1,16 @@
 """Fallback parser for when Unstructured is not available - uses SimpleDirectoryReader."""
 
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from typing import Iterable, Iterator
 
 from llama_index.core import Document
 from llama_index.core import SimpleDirectoryReader
-from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.schema import TextNode
+
+from ..rag.token_splitter import TokenWindowSplitter
+from .parse_result import ParseResult, parse_or_capture
 
 
 class FallbackPDFParser:
@@ -13,47 +19,64 @@ class FallbackPDFParser:
     def __init__(self, chunk_size: int = 512, chunk_overlap: int = 50):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self._splitter = SentenceSplitter(
+        self._splitter = TokenWindowSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
         )
 
-    def parse_file(self, file_path: str | Path) -> list[Document]:
-        """Parse a file using SimpleDirectoryReader."""
+    def parse_file(self, file_path: str | Path) -> list[TextNode]:
+        """Parse a file using SimpleDirectoryReader into chunk nodes."""
         path = Path(file_path)
         if not path.exists():
             raise FileNotFoundError(f"File not found: {path}")
 
         reader = SimpleDirectoryReader(input_files=[str(path)])
-        docs = reader.load_data()
-        nodes = self._splitter.get_nodes_from_documents(docs)
+        return self._to_nodes(reader.load_data())
 
-        documents = []
-        for i, node in enumerate(nodes):
-            doc = Document(
-                text=node.text,
-                metadata={**node.metadata, "chunk_id": i, "node_id": node.node_id},
-            )
-            documents.append(doc)
+    def parse_file_as_documents(self, file_path: str | Path) -> list[Document]:
+        """parse_file for callers that need Documents rather than nodes."""
+        return [Document(text=n.text, metadata=n.metadata) for n in self.parse_file(file_path)]
+
+    def iter_parse_files(self, paths: Iterable[str | Path]) -> Iterator[ParseResult]:
+        """Parse several files in worker processes, yielding each file's result (or error) as it finishes."""
+        paths = [Path(p) for p in paths]
+        if len(paths) <= 1:
+            for p in paths:
+                yield parse_or_capture(p, lambda: self.parse_file(p))
+            return
+
+        with ProcessPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as ex:
+            futures = {ex.submit(_parse_one, p, self.chunk_size, self.chunk_overlap): p for p in paths}
+            for future in as_completed(futures):
+                yield parse_or_capture(futures.pop(future), future.result)
 
-        return documents
+    def parse_files(self, paths: Iterable[str | Path]) -> list[TextNode]:
+        """Parse several files in parallel into one list (files that fail are logged and skipped)."""
+        return [node for result in self.iter_parse_files(paths) for node in result.nodes]
 
-    def parse_directory(self, directory: str | Path) -> list[Document]:
+    def parse_directory(self, directory: str | Path) -> list[TextNode]:
         """Parse all supported files in a directory."""
         dir_path = Path(directory)
         if not dir_path.is_dir():
             raise NotADirectoryError(f"Not a directory: {dir_path}")
 
         reader = SimpleDirectoryReader(input_dir=str(dir_path), recursive=True)
-        docs = reader.load_data()
-        nodes = self._splitter.get_nodes_from_documents(docs)
+        return self._to_nodes(reader.load_data(num_workers=_num_workers(len(reader.input_files))))
 
-        documents = []
+    def _to_nodes(self, docs: list[Document]) -> list[TextNode]:
+        """Split loaded documents into chunk nodes, numbering them in place."""
+        nodes = self._splitter.get_nodes_from_documents(docs)
         for i, node in enumerate(nodes):
-            doc = Document(
-                text=node.text,
-                metadata={**node.metadata, "chunk_id": i, "node_id": node.node_id},
-            )
-            documents.append(doc)
+            node.metadata["chunk_id"] = i
+        return nodes
+
+
+def _parse_one(path: Path, chunk_size: int, chunk_overlap: int) -> list[TextNode]:
+    """Worker-process entry point (module-level so it pickles)."""
+    return FallbackPDFParser(chunk_size=chunk_size, chunk_overlap=chunk_overlap).parse_file(path)
+
 
-        return documents
+def _num_workers(n_files: int) -> int | None:
+    """Worker processes for SimpleDirectoryReader (None = load in-process)."""
+    workers = min(n_files, os.cpu_count() or 1)
+    return workers if workers > 1 else None
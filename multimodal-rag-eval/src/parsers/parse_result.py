@@ -0,0 +1,26 @@
+"""Per-file parse outcome shared by the parsers' iter_parse_files."""
+
+import logging
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+
+from llama_index.core.schema import TextNode
+
+logger = logging.getLogger(__name__)
+
+
+class ParseResult(NamedTuple):
+    """One file's chunks, or the error that stopped it from being parsed."""
+
+    path: Path
+    nodes: list[TextNode]
+    error: Optional[Exception] = None
+
+
+def parse_or_capture(path: Path, parse: Callable[[], list[TextNode]]) -> ParseResult:
+    """Run one file's parse, returning (and logging) a failure instead of raising it."""
+    try:
+        return ParseResult(path, parse())
+    except Exception as e:
+        logger.warning("Failed to parse %s: %s", path, e)
+        return ParseResult(path, [], e)
@@ -1,5 +1,6 @@
 """RAG pipeline with hybrid search (Vector + BM25)."""
 
 from .hybrid_rag import HybridRAGPipeline
+from .token_splitter import TokenWindowSplitter
 
-__all__ = ["HybridRAGPipeline"]
+__all__ = ["HybridRAGPipeline", "TokenWindowSplitter"]
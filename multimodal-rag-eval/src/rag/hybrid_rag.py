@@ -4,24 +4,36 @@ Combines dense retrieval (ChromaDB) with sparse retrieval (BM25) for
 improved accuracy on technical documents with specific terminology.
 """
 
+import hashlib
+import importlib.util
+import json
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
-# Required for QueryFusionRetriever async in sync contexts (Streamlit, scripts)
-import nest_asyncio
-nest_asyncio.apply()
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Literal, Optional
 
 import chromadb
-from llama_index.core import Document, Settings, StorageContext, VectorStoreIndex
-from llama_index.core.node_parser import SentenceSplitter
+import numpy as np
+from llama_index.core import Document, QueryBundle, Settings, StorageContext, VectorStoreIndex
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.bridge.pydantic import PrivateAttr
 from llama_index.core.query_engine import RetrieverQueryEngine
-from llama_index.core.retrievers import QueryFusionRetriever
-from llama_index.core.storage.docstore import SimpleDocumentStore
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import BaseNode, MetadataMode, NodeWithScore
+from llama_index.core.storage.docstore.keyval_docstore import KVDocumentStore
+from llama_index.core.vector_stores.utils import metadata_dict_to_node
 from llama_index.embeddings.openai import OpenAIEmbedding
 from llama_index.llms.openai import OpenAI
 from llama_index.vector_stores.chroma import ChromaVectorStore
 
+from .scalar_quantizer import CALIBRATION_SAMPLE, ScalarQuantizedStore
+from .sqlite_kvstore import SQLiteKVStore
+from .token_splitter import TokenWindowSplitter
+
 try:
     from llama_index.retrievers.bm25 import BM25Retriever
     import Stemmer
@@ -29,6 +41,321 @@ try:
 except ImportError:
     HAS_BM25 = False
 
+# One stemmer for every BM25 retriever this process builds or loads (fitting and query tokenization)
+_STEMMER = Stemmer.Stemmer("english") if HAS_BM25 else None
+
+# bm25s can score with Numba-JIT kernels (same scores). Opt-in via bm25_numba: compiling them costs
+# several seconds on each process's first BM25 query, which only pays off on large corpora
+HAS_NUMBA = importlib.util.find_spec("numba") is not None
+
+# Chroma HNSW settings, applied when the collection is created. Small sync/batch windows flush
+# incremental inserts to the HNSW segment promptly instead of leaving them in the brute-force buffer.
+DEFAULT_HNSW_PARAMS = {
+    "hnsw:space": "cosine",
+    "hnsw:sync_threshold": 100,
+    "hnsw:batch_size": 100,
+    "hnsw:M": 32,
+    "hnsw:construction_ef": 200,
+    "hnsw:search_ef": 100,
+}
+
+# Reciprocal-rank-fusion constant (same as LlamaIndex's reciprocal_rerank mode)
+RRF_K = 60
+
+# Chunks per embeddings request at ingest (the API accepts up to 2048 inputs)
+EMBED_BATCH_SIZE = 256
+
+# Characters of each source shown in query() results (full text goes in retrieved_contexts)
+SOURCE_PREVIEW_CHARS = 500
+
+# Docstore and fitted BM25 index are saved next to Chroma, under chroma_persist_dir
+DOCSTORE_FILENAME = "docstore.sqlite3"
+BM25_PERSIST_SUBDIR = "bm25"
+_BM25_META = "corpus.json"
+SQ_PERSIST_SUBDIR = "sq8"
+
+# Quantized search scans uint8 codes for top_k * SQ_OVERSAMPLE candidates, then re-ranks in float32
+SQ_OVERSAMPLE = 4
+# Below this many vectors, dense search scans an in-memory matrix instead of Chroma's HNSW graph
+# (at this size a BLAS matvec beats graph traversal; ~120 MB of float32 at 1536 dims)
+DENSE_SCAN_MAX_VECTORS = 20_000
+
+# Recent queries whose retrieved node ids are remembered (cleared on ingest)
+RETRIEVE_CACHE_SIZE = 256
+# Embeddings fetched per Chroma get() when exporting the collection
+EXPORT_PAGE_SIZE = 5000
+
+
+class _CachingEmbedding(BaseEmbedding):
+    """Wraps an embedder with a thread-safe LRU of query embeddings.
+
+    Keyed on the SHA-256 of the query text, so repeated questions skip the embedding API.
+    With precision="int8" entries are stored as (int8 bytes, scale) - ~1.5 KB instead of
+    ~50 KB of Python floats for a 1536-dim vector - and returned dequantized, on the first
+    (uncached) call too, so a question always searches with the same vector.
+    Document (text) embeddings are passed straight through, batched by the wrapped model.
+    """
+
+    _inner: BaseEmbedding = PrivateAttr()
+    _precision: str = PrivateAttr()
+    _cache_size: int = PrivateAttr()
+    _cache_ttl: Optional[float] = PrivateAttr()
+    _cache: OrderedDict = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr()
+
+    def __init__(
+        self,
+        inner: BaseEmbedding,
+        cache_size: int = 1024,
+        cache_ttl: Optional[float] = None,
+        precision: str = "fp32",
+    ):
+        super().__init__(model_name=inner.model_name, embed_batch_size=inner.embed_batch_size)
+        self._inner = inner
+        self._precision = precision
+        self._cache_size = cache_size
+        self._cache_ttl = cache_ttl
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: str) -> Optional[list[float]]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self._cache_ttl is not None and time.monotonic() - stored_at > self._cache_ttl:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+        return _dequantize_int8(*value) if self._precision == "int8" else list(value)
+
+    def _store(self, key: str, embedding: list[float]) -> list[float]:
+        """Cache an embedding; returns it as later hits will see it (dequantized under int8)."""
+        value = _quantize_int8(embedding) if self._precision == "int8" else tuple(embedding)
+        with self._lock:
+            self._cache[key] = (time.monotonic(), value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        # A miss searches with the same vector as every repeat of the question
+        return _dequantize_int8(*value) if self._precision == "int8" else embedding
+
+    def _get_query_embedding(self, query: str) -> list[float]:
+        key = hashlib.sha256(query.encode()).hexdigest()
+        embedding = self._lookup(key)
+        if embedding is None:
+            embedding = self._store(key, self._inner.get_query_embedding(query))
+        return embedding
+
+    async def _aget_query_embedding(self, query: str) -> list[float]:
+        key = hashlib.sha256(query.encode()).hexdigest()
+        embedding = self._lookup(key)
+        if embedding is None:
+            embedding = self._store(key, await self._inner.aget_query_embedding(query))
+        return embedding
+
+    def _get_text_embedding(self, text: str) -> list[float]:
+        return self._inner.get_text_embedding(text)
+
+    async def _aget_text_embedding(self, text: str) -> list[float]:
+        return await self._inner.aget_text_embedding(text)
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return self._inner.get_text_embedding_batch(texts)
+
+    async def _aget_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return await self._inner.aget_text_embedding_batch(texts)
+
+
+def _quantize_int8(vec: list[float]) -> tuple[bytes, float]:
+    """Symmetric per-vector scalar quantization: v ~= q * scale, q in [-127, 127]."""
+    v = np.asarray(vec, dtype=np.float32)
+    scale = float(np.abs(v).max()) / 127 or 1.0
+    return np.round(v / scale).astype(np.int8).tobytes(), scale
+
+
+def _dequantize_int8(data: bytes, scale: float) -> list[float]:
+    return (np.frombuffer(data, dtype=np.int8).astype(np.float32) * scale).tolist()
+
+
+def _reciprocal_rank_fusion(result_lists: list[list[NodeWithScore]], top_n: int) -> list[NodeWithScore]:
+    """Fuse ranked lists by summing 1 / (RRF_K + rank) per node; keep the top_n.
+
+    Each list must already be best-first, as retrievers return them.
+    """
+    fused: dict[str, float] = {}
+    nodes: dict[str, NodeWithScore] = {}
+    for results in result_lists:
+        for rank, node_with_score in enumerate(results):
+            node_id = node_with_score.node.node_id
+            fused[node_id] = fused.get(node_id, 0.0) + 1.0 / (RRF_K + rank)
+            nodes.setdefault(node_id, node_with_score)
+
+    top_ids = sorted(fused, key=fused.get, reverse=True)[:top_n]
+    return [NodeWithScore(node=nodes[i].node, score=fused[i]) for i in top_ids]
+
+
+class _ParallelFusionRetriever(BaseRetriever):
+    """Runs the dense and BM25 retrievers concurrently on a thread pool and RRF-fuses the results.
+
+    Both legs overlap (dense waits on the embeddings API and Chroma, BM25 is numpy work)
+    without an event loop, so callers don't need nest_asyncio.
+    """
+
+    def __init__(self, retrievers: list[BaseRetriever], executor: ThreadPoolExecutor, top_k: int):
+        super().__init__()
+        self._retrievers = retrievers
+        self._executor = executor
+        self._top_k = top_k
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        # The last leg runs on the calling thread, so a two-way fusion costs one pool handoff
+        *offloaded, last = self._retrievers
+        futures = [self._executor.submit(r.retrieve, query_bundle) for r in offloaded]
+        last_results = last.retrieve(query_bundle)
+        return _reciprocal_rank_fusion([f.result() for f in futures] + [last_results], self._top_k)
+
+
+class _EmbeddingMatrix:
+    """All corpus embeddings as one L2-normalized float32 matrix; cosine is a single matvec."""
+
+    def __init__(self):
+        # (ids, matrix) swapped as one tuple so concurrent searches never see them out of step
+        self._snapshot: tuple[list[str], np.ndarray] = ([], np.empty((0, 0), dtype=np.float32))
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._snapshot[0])
+
+    def add(self, ids: list[str], embeddings: np.ndarray) -> None:
+        x = np.asarray(embeddings, dtype=np.float32)
+        if not len(x):
+            return
+        x = x / np.maximum(np.linalg.norm(x, axis=1, keepdims=True), 1e-12)
+        with self._lock:
+            old_ids, old = self._snapshot
+            self._snapshot = (old_ids + list(ids), np.concatenate([old, x]) if old_ids else x)
+
+    def search(self, query: list[float], k: int) -> list[tuple[str, float]]:
+        """(id, cosine) of the k nearest embeddings, best first."""
+        ids, matrix = self._snapshot
+        if not ids or k <= 0:
+            return []
+        q = np.asarray(query, dtype=np.float32)
+        scores = matrix @ (q / max(float(np.linalg.norm(q)), 1e-12))
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [(ids[i], float(scores[i])) for i in top[np.argsort(-scores[top])]]
+
+
+class _MatrixVectorRetriever(BaseRetriever):
+    """Exact dense retrieval against an in-memory _EmbeddingMatrix; nodes are looked up by id."""
+
+    def __init__(
+        self,
+        matrix: _EmbeddingMatrix,
+        resolve_nodes: Callable[[list[str]], list[Optional[BaseNode]]],
+        embed_model: BaseEmbedding,
+        top_k: int,
+    ):
+        super().__init__()
+        self._matrix = matrix
+        self._resolve_nodes = resolve_nodes
+        self._embed_model = embed_model
+        self._top_k = top_k
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        query = query_bundle.embedding or self._embed_model.get_query_embedding(query_bundle.query_str)
+        hits = self._matrix.search(query, self._top_k)
+        nodes = self._resolve_nodes([node_id for node_id, _ in hits])
+        return [
+            NodeWithScore(node=node, score=score) for node, (_, score) in zip(nodes, hits) if node is not None
+        ]
+
+
+class _QuantizedVectorRetriever(BaseRetriever):
+    """Dense retrieval over the uint8 codes, re-ranked by exact cosine on the float32 embeddings.
+
+    The codes nominate top_k * SQ_OVERSAMPLE candidates; only those have their float32
+    vectors (with their stored nodes) fetched from Chroma.
+    """
+
+    def __init__(self, store, collection, embed_model: BaseEmbedding, top_k: int):
+        super().__init__()
+        self._store = store
+        self._collection = collection
+        self._embed_model = embed_model
+        self._top_k = top_k
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        query = query_bundle.embedding or self._embed_model.get_query_embedding(query_bundle.query_str)
+        candidates = self._store.search(query, self._top_k * SQ_OVERSAMPLE)
+        if not candidates:
+            return []
+
+        got = self._collection.get(ids=candidates, include=["embeddings", "documents", "metadatas"])
+        exact = np.asarray(got["embeddings"], dtype=np.float32)
+        q = np.asarray(query, dtype=np.float32)
+        scores = exact @ q / (np.linalg.norm(exact, axis=1) * np.linalg.norm(q) + 1e-12)
+        order = np.argsort(-scores)[:self._top_k]
+        return [
+            NodeWithScore(
+                node=metadata_dict_to_node(got["metadatas"][i], text=got["documents"][i]),
+                score=float(scores[i]),
+            )
+            for i in order
+        ]
+
+
+class _CachedRetriever(BaseRetriever):
+    """LRU of recent results per query text, kept as (node id, score); hits look the nodes up by id.
+
+    Repeated questions (evaluation loops, reruns) skip the dense and BM25 searches entirely.
+    """
+
+    def __init__(
+        self,
+        inner: BaseRetriever,
+        resolve_nodes: Callable[[list[str]], list[Optional[BaseNode]]],
+        max_size: int = RETRIEVE_CACHE_SIZE,
+    ):
+        super().__init__()
+        self._inner = inner
+        self._resolve_nodes = resolve_nodes
+        self._max_size = max_size
+        self._cache: OrderedDict[str, list[tuple[str, Optional[float]]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        key = query_bundle.query_str
+        with self._lock:
+            hits = self._cache.get(key)
+            if hits is not None:
+                self._cache.move_to_end(key)
+        if hits is not None:
+            nodes = self._resolve_nodes([node_id for node_id, _ in hits])
+            return [
+                NodeWithScore(node=node, score=score) for node, (_, score) in zip(nodes, hits) if node is not None
+            ]
+
+        results = self._inner.retrieve(query_bundle)
+        with self._lock:
+            self._cache[key] = [(r.node.node_id, r.score) for r in results]
+            while len(self._cache) > self._max_size:
+                self._cache.popitem(last=False)
+        return results
+
+
+def _with_jit_scoring(retriever: "BM25Retriever") -> "BM25Retriever":
+    """Switch the retriever's bm25s index to the Numba backend."""
+    retriever.bm25.backend = "numba"
+    return retriever
+
 
 class HybridRAGPipeline:
     """RAG pipeline with hybrid Vector + BM25 retrieval."""
@@ -39,14 +366,26 @@ class HybridRAGPipeline:
         collection_name: str = "multimodal_rag",
         llm_model: str = "gpt-4o-mini",
         embedding_model: str = "text-embedding-3-small",
+        embedding_dim: Optional[int] = None,
         chunk_size: int = 512,
         chunk_overlap: int = 50,
         top_k: int = 5,
         openai_api_key: Optional[str] = None,
+        embedding_precision: Literal["fp32", "int8"] = "fp32",
+        cache_size: int = 1024,
+        hnsw_params: Optional[dict] = None,
+        quantized_search: bool = False,
+        in_memory_vectors: Optional[bool] = None,
+        chroma_server_host: Optional[str] = None,
+        chroma_server_port: int = 8000,
+        bm25_numba: bool = False,
     ):
         self.chroma_persist_dir = chroma_persist_dir
         self.collection_name = collection_name
         self.top_k = top_k
+        self.embedding_model = embedding_model
+        self.embedding_dim = embedding_dim
+        self.embedding_precision = embedding_precision
 
         api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
         if not api_key:
@@ -54,35 +393,133 @@ class HybridRAGPipeline:
 
         # Configure LlamaIndex Settings
         Settings.llm = OpenAI(model=llm_model, api_key=api_key)
-        Settings.embed_model = OpenAIEmbedding(
-            model=embedding_model,
-            api_key=api_key,
+        self._embed_model = _CachingEmbedding(
+            OpenAIEmbedding(
+                model=embedding_model,
+                api_key=api_key,
+                embed_batch_size=EMBED_BATCH_SIZE,
+                # text-embedding-3 models shorten (and renormalize) vectors server-side
+                dimensions=embedding_dim,
+            ),
+            cache_size=cache_size,
+            precision=embedding_precision,
         )
+        Settings.embed_model = self._embed_model
 
-        self._splitter = SentenceSplitter(
+        self._splitter = TokenWindowSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
         )
 
-        # Initialize ChromaDB
+        # ChromaDB is opened on first use (see _chroma_collection)
         Path(chroma_persist_dir).mkdir(parents=True, exist_ok=True)
-        self._chroma_client = chromadb.PersistentClient(path=chroma_persist_dir)
-        self._chroma_collection = self._chroma_client.get_or_create_collection(
-            collection_name,
-            metadata={"hnsw:space": "cosine"},
-        )
-        self._vector_store = ChromaVectorStore(chroma_collection=self._chroma_collection)
+        self._chroma_server = (chroma_server_host, chroma_server_port)
+        self._collection_metadata = {**DEFAULT_HNSW_PARAMS, **(hnsw_params or {})}
+        self._collection = None
+        self._chroma_vector_store: Optional[ChromaVectorStore] = None
+        self._chroma_lock = threading.Lock()
 
-        self._docstore: Optional[SimpleDocumentStore] = None
+        # Nodes live in SQLite beside Chroma: nothing is held in RAM and the corpus survives restarts
+        self._kvstore = SQLiteKVStore(Path(chroma_persist_dir) / DOCSTORE_FILENAME)
+        self._docstore = KVDocumentStore(self._kvstore)
+        # Optional uint8 copy of the embeddings for a 4x smaller dense scan (see _QuantizedVectorRetriever)
+        self._sq_store = (
+            ScalarQuantizedStore(Path(chroma_persist_dir) / SQ_PERSIST_SUBDIR) if quantized_search else None
+        )
+        # Dense search on an in-memory matrix: forced on by RAG_CACHE=1 or in_memory_vectors=True,
+        # off with False; by default only while the corpus is small (see _use_dense_scan)
+        if os.getenv("RAG_CACHE") == "1":
+            in_memory_vectors = True
+        self._in_memory_vectors = in_memory_vectors
+        self._emb_matrix: Optional[_EmbeddingMatrix] = None
+        self._emb_matrix_warm = False
         self._index: Optional[VectorStoreIndex] = None
         self._query_engine: Optional[RetrieverQueryEngine] = None
+        self._engine_dirty = False
+        self._vector_retriever: Optional[BaseRetriever] = None
+        self._seen_doc_count = -1  # docstore size the current engine was built against
+        # BM25 is O(corpus) to fit, so it's only rebuilt when the docstore has grown
+        self._bm25: Optional["BM25Retriever"] = None
+        self._bm25_doc_count = -1
+        self._bm25_in_engine: Optional["BM25Retriever"] = None
+        self._bm25_numba = bm25_numba and HAS_NUMBA
+        self._cached_retriever: Optional[_CachedRetriever] = None
+        # Dense and BM25 retrieval run side by side per query
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hybrid-retrieval")
+
+    @property
+    def _chroma_collection(self):
+        """The Chroma collection, opened (or created) on first access.
+
+        A standalone chroma server keeps the HNSW index out of this process (and shares it
+        between workers); otherwise Chroma runs embedded on local disk. The docstore, BM25 index
+        and sq8 codes stay under chroma_persist_dir either way, so workers sharing a server must
+        also share that directory (and ingest from one process at a time).
+        """
+        if self._collection is None:
+            with self._chroma_lock:
+                if self._collection is None:
+                    host, port = self._chroma_server
+                    if host:
+                        client = chromadb.HttpClient(host=host, port=port)
+                    else:
+                        client = chromadb.PersistentClient(path=self.chroma_persist_dir)
+                    collection = client.get_or_create_collection(
+                        self.collection_name,
+                        metadata=self._collection_metadata,
+                    )
+                    if self._stored_dim_mismatch(collection):
+                        # Only rebuild what the local docstore can fully reproduce; collections from
+                        # before the SQLite docstore (or written by other hosts) would be lost
+                        if self._doc_count() < collection.count():
+                            raise ValueError(
+                                f"Chroma collection {self.collection_name!r} holds "
+                                f"{collection.count()} vectors of a different size than "
+                                f"embedding_dim={self.embedding_dim}, but the docstore only has "
+                                f"{self._doc_count()} nodes to re-embed. Set embedding_dim to the "
+                                "stored size, or delete the collection and re-ingest the documents."
+                            )
+                        client.delete_collection(self.collection_name)
+                        collection = client.get_or_create_collection(
+                            self.collection_name,
+                            metadata=self._collection_metadata,
+                        )
+                        self._reembed_docstore(collection)
+                    self._collection = collection
+        return self._collection
+
+    def _stored_dim_mismatch(self, collection) -> bool:
+        """Whether the collection holds vectors of a different size than embedding_dim."""
+        if not self.embedding_dim or not collection.count():
+            return False
+        stored = collection.get(limit=1, include=["embeddings"])["embeddings"]
+        return len(stored[0]) != self.embedding_dim
+
+    def _reembed_docstore(self, collection) -> None:
+        """Re-embed every docstore node into a fresh collection (after an embedding_dim change)."""
+        vector_store = ChromaVectorStore(chroma_collection=collection)
+        nodes = list(self._docstore.docs.values())
+        for start in range(0, len(nodes), EXPORT_PAGE_SIZE):
+            batch = nodes[start:start + EXPORT_PAGE_SIZE]
+            texts = [n.get_content(metadata_mode=MetadataMode.EMBED) for n in batch]
+            for node, embedding in zip(batch, self._embed_model.get_text_embedding_batch(texts)):
+                node.embedding = embedding
+            vector_store.add(batch)
+        if self._sq_store is not None:
+            # Codes of the old vectors; rebuilt from the new collection on next use
+            self._sq_store.rebuild([], np.empty((0, 0), dtype=np.float32))
+
+    @property
+    def _vector_store(self) -> ChromaVectorStore:
+        if self._chroma_vector_store is None:
+            self._chroma_vector_store = ChromaVectorStore(chroma_collection=self._chroma_collection)
+        return self._chroma_vector_store
 
     def _ensure_index(self) -> VectorStoreIndex:
         """Ensure index exists; create empty if needed."""
         if self._index is not None:
             return self._index
 
-        self._docstore = SimpleDocumentStore()
         storage_context = StorageContext.from_defaults(
             docstore=self._docstore,
             vector_store=self._vector_store,
@@ -95,47 +532,188 @@ class HybridRAGPipeline:
 
     def ingest_documents(self, documents: list[Document]) -> None:
         """Ingest documents into the hybrid index."""
+        self.ingest_nodes(self._splitter.get_nodes_from_documents(documents))
+
+    def ingest_nodes(self, nodes: list[BaseNode]) -> None:
+        """Ingest already-chunked nodes (e.g. from the parsers) without re-splitting."""
         index = self._ensure_index()
-        nodes = self._splitter.get_nodes_from_documents(documents)
         self._docstore.add_documents(nodes)
+
+        # Embed up front in large batches; insert_nodes skips nodes that already have one
+        pending = [n for n in nodes if n.embedding is None]
+        if pending:
+            texts = [n.get_content(metadata_mode=MetadataMode.EMBED) for n in pending]
+            for node, embedding in zip(pending, self._embed_model.get_text_embedding_batch(texts)):
+                node.embedding = embedding
         index.insert_nodes(nodes)
         self._index = index
-        self._query_engine = None  # Rebuild on next query
+        if self._sq_store is not None:
+            self._sync_quantized(nodes)
+        if self._emb_matrix_warm:
+            self._emb_matrix.add([n.node_id for n in nodes], np.asarray([n.embedding for n in nodes]))
+            if not self._use_dense_scan():
+                # Outgrew the scan: release the matrix and rebuild the engine on Chroma's HNSW
+                self._emb_matrix, self._emb_matrix_warm = None, False
+                self._vector_retriever = self._query_engine = None
+        if self._cached_retriever is not None:
+            self._cached_retriever.clear()
+        self._engine_dirty = True  # Re-check BM25 on next query
 
     def _build_query_engine(self) -> RetrieverQueryEngine:
         """Build query engine with hybrid retriever."""
-        if self._query_engine is not None:
+        doc_count = self._doc_count()
+        if self._query_engine is not None and not self._engine_dirty:
+            if doc_count == self._seen_doc_count:
+                return self._query_engine
+            # Another process sharing chroma_persist_dir ingested: reload the per-process indexes
+            self._emb_matrix_warm = False
+            self._vector_retriever = self._query_engine = None
+        self._engine_dirty = False
+        self._seen_doc_count = doc_count
+
+        # The dense stores are all updated incrementally, so one retriever serves for the pipeline's lifetime
+        if self._vector_retriever is None:
+            self._vector_retriever = self._dense_retriever()
+
+        bm25_retriever = self._current_bm25() if HAS_BM25 else None
+        if self._query_engine is not None and bm25_retriever is self._bm25_in_engine:
             return self._query_engine
 
-        index = self._ensure_index()
-        vector_retriever = index.as_retriever(similarity_top_k=self.top_k)
-
-        if HAS_BM25:
-            bm25_retriever = BM25Retriever.from_defaults(
-                docstore=index.docstore,
-                similarity_top_k=self.top_k,
-                stemmer=Stemmer.Stemmer("english"),
-                language="english",
-            )
-            retriever = QueryFusionRetriever(
-                [vector_retriever, bm25_retriever],
-                num_queries=1,
-                use_async=True,
+        if bm25_retriever is not None:
+            retriever = _ParallelFusionRetriever(
+                [self._vector_retriever, bm25_retriever],
+                self._executor,
+                top_k=self.top_k,
             )
         else:
-            retriever = vector_retriever
+            retriever = self._vector_retriever
 
-        self._query_engine = RetrieverQueryEngine.from_retriever(retriever)
+        self._cached_retriever = _CachedRetriever(retriever, self._nodes_by_id)
+        self._query_engine = RetrieverQueryEngine.from_args(self._cached_retriever)
+        self._bm25_in_engine = bm25_retriever
         return self._query_engine
 
+    def _dense_retriever(self) -> BaseRetriever:
+        """In-memory matrix if in use, else the uint8 scan if enabled, else Chroma's HNSW."""
+        if self._use_dense_scan():
+            self.ensure_cache_warm()
+            return _MatrixVectorRetriever(self._emb_matrix, self._nodes_by_id, self._embed_model, self.top_k)
+        if self._sq_store is not None:
+            if len(self._sq_store) != self._chroma_collection.count():
+                self._sq_store.rebuild(*self._export_embeddings())
+            return _QuantizedVectorRetriever(
+                self._sq_store, self._chroma_collection, self._embed_model, self.top_k
+            )
+        return self._ensure_index().as_retriever(similarity_top_k=self.top_k)
+
+    def _use_dense_scan(self) -> bool:
+        """Whether dense search should use the in-memory matrix (explicit setting, else corpus size)."""
+        if self._in_memory_vectors is not None:
+            return self._in_memory_vectors
+        if self._sq_store is not None:
+            return False
+        # Only when this docstore covers the whole collection (not e.g. a legacy collection, or a
+        # Chroma server other hosts ingest into); otherwise Chroma's search returns the nodes itself
+        count = self._chroma_collection.count()
+        return count <= DENSE_SCAN_MAX_VECTORS and self._doc_count() == count
+
+    def _nodes_by_id(self, node_ids: list[str]) -> list[Optional[BaseNode]]:
+        """Nodes in id order from the docstore, fetching any it lacks from Chroma (None if in neither)."""
+        nodes = [self._docstore.get_node(node_id, raise_error=False) for node_id in node_ids]
+        missing = [node_id for node_id, node in zip(node_ids, nodes) if node is None]
+        if missing:
+            got = self._chroma_collection.get(ids=missing, include=["documents", "metadatas"])
+            found = {
+                node_id: metadata_dict_to_node(metadata, text=text)
+                for node_id, text, metadata in zip(got["ids"], got["documents"], got["metadatas"])
+            }
+            nodes = [node if node is not None else found.get(node_id) for node_id, node in zip(node_ids, nodes)]
+        return nodes
+
+    def ensure_cache_warm(self) -> None:
+        """Load every embedding from Chroma into the in-memory matrix (once; ingests then append)."""
+        if self._emb_matrix_warm:
+            return
+        self._emb_matrix = _EmbeddingMatrix()
+        self._emb_matrix.add(*self._export_embeddings())
+        self._emb_matrix_warm = True
+
+    def _sync_quantized(self, nodes: list[BaseNode]) -> None:
+        """Add newly ingested nodes to the uint8 store; refit it entirely while it is still small."""
+        if len(self._sq_store) + len(nodes) <= CALIBRATION_SAMPLE:
+            # Ranges from a handful of vectors would clip everything after them
+            self._sq_store.rebuild(*self._export_embeddings())
+        else:
+            self._sq_store.add([n.node_id for n in nodes], np.asarray([n.embedding for n in nodes]))
+
+    def _export_embeddings(self) -> tuple[list[str], np.ndarray]:
+        """All ids and float32 embeddings in the Chroma collection, fetched page by page."""
+        ids, embeddings = [], []
+        for offset in range(0, self._chroma_collection.count(), EXPORT_PAGE_SIZE):
+            page = self._chroma_collection.get(include=["embeddings"], limit=EXPORT_PAGE_SIZE, offset=offset)
+            ids.extend(page["ids"])
+            embeddings.append(np.asarray(page["embeddings"], dtype=np.float32))
+        return ids, np.concatenate(embeddings) if embeddings else np.empty((0, 0), dtype=np.float32)
+
+    def _current_bm25(self) -> Optional["BM25Retriever"]:
+        """The BM25 retriever, refitted only if the docstore changed size since it was built."""
+        doc_count = self._doc_count()
+        if self._bm25 is None or doc_count != self._bm25_doc_count:
+            self._bm25 = self._bm25_retriever()
+            self._bm25_doc_count = doc_count
+        return self._bm25
+
+    def _doc_count(self) -> int:
+        """Nodes in the docstore, counted in SQLite without loading them."""
+        return self._kvstore.count(self._docstore._node_collection)
+
+    @property
+    def _bm25_dir(self) -> Path:
+        return Path(self.chroma_persist_dir) / BM25_PERSIST_SUBDIR
+
+    def _bm25_retriever(self) -> Optional["BM25Retriever"]:
+        """BM25 over the docstore: memory-mapped from disk while it matches, else refitted and saved.
+
+        Returns None when there is nothing to index.
+        """
+        doc_count = self._doc_count()
+        if doc_count == 0:
+            return None
+
+        # Node ids and content hashes, so a replaced corpus of the same size isn't mistaken for this one
+        fingerprint = self._kvstore.fingerprint(self._docstore._metadata_collection)
+        meta = self._bm25_dir / _BM25_META
+        if meta.exists() and json.loads(meta.read_text()) == {"count": doc_count, "fingerprint": fingerprint}:
+            retriever = BM25Retriever.from_persist_dir(str(self._bm25_dir), mmap=True)
+            # bm25s rejects k above the corpus size (from_defaults clamps this itself)
+            retriever.similarity_top_k = min(self.top_k, doc_count)
+            retriever.stemmer = _STEMMER
+            return _with_jit_scoring(retriever) if self._bm25_numba else retriever
+
+        retriever = BM25Retriever.from_defaults(
+            docstore=self._docstore,
+            similarity_top_k=self.top_k,
+            stemmer=_STEMMER,
+            language="english",
+        )
+        self._bm25_dir.mkdir(parents=True, exist_ok=True)
+        retriever.persist(str(self._bm25_dir))
+        meta.write_text(json.dumps({"count": doc_count, "fingerprint": fingerprint}))
+        return _with_jit_scoring(retriever) if self._bm25_numba else retriever
+
     def query(
         self,
         question: str,
         return_sources: bool = True,
+        max_preview_chars: int = SOURCE_PREVIEW_CHARS,
     ) -> dict:
-        """Query the RAG pipeline and return response with optional sources."""
+        """Query the RAG pipeline and return response with optional sources.
+
+        Each source carries a preview of at most max_preview_chars characters; with 0 sources
+        only carry scores (the full texts are always in retrieved_contexts).
+        """
         engine = self._build_query_engine()
-        response = engine.query(question)
+        response = engine.query(self._query_bundle(question))
 
         result = {
             "answer": str(response),
@@ -143,20 +721,42 @@ class HybridRAGPipeline:
         }
 
         if return_sources and response.source_nodes:
-            result["sources"] = [
-                {
-                    "text": node.text[:500] + "..." if len(node.text) > 500 else node.text,
-                    "score": getattr(node, "score", None),
-                }
-                for node in response.source_nodes
-            ]
-            result["retrieved_contexts"] = [node.text for node in response.source_nodes]
+            # One pass builds both the truncated previews and the full contexts
+            sources, contexts = [], []
+            for node in response.source_nodes:
+                text = node.text
+                contexts.append(text)
+                if not max_preview_chars:
+                    sources.append({"score": node.score})
+                elif len(text) <= max_preview_chars:
+                    sources.append({"text": text, "score": node.score})
+                else:
+                    sources.append({"text": f"{text[:max_preview_chars]}...", "score": node.score})
+            result["sources"] = sources
+            result["retrieved_contexts"] = contexts
 
         return result
 
+    def query_with_contexts(self, question: str) -> tuple[str, list[str]]:
+        """Answer plus the full contexts it was generated from, from a single retrieval.
+
+        The usual Ragas input; prefer it over query() followed by get_retrieved_contexts().
+        """
+        result = self.query(question, return_sources=True, max_preview_chars=0)
+        return result["answer"], result.get("retrieved_contexts", [])
+
     def get_retrieved_contexts(self, question: str) -> list[str]:
-        """Get retrieved context strings for evaluation (Ragas)."""
+        """Get retrieved context strings for evaluation (Ragas), without generating an answer."""
         engine = self._build_query_engine()
         retriever = engine.retriever
-        nodes = retriever.retrieve(question)
+        nodes = retriever.retrieve(self._query_bundle(question))
         return [node.text for node in nodes]
+
+    def get_retrieved_contexts_with_scores(self, question: str) -> list[tuple[str, Optional[float]]]:
+        """Retrieved (context, score) pairs, without building source previews."""
+        nodes = self._build_query_engine().retriever.retrieve(self._query_bundle(question))
+        return [(node.text, node.score) for node in nodes]
+
+    def _query_bundle(self, question: str) -> QueryBundle:
+        """Query with its (cached) embedding attached, so the vector retriever doesn't re-embed."""
+        return QueryBundle(question, embedding=self._embed_model.get_query_embedding(question))
@@ -0,0 +1,103 @@
+"""Scalar-quantized (uint8) copy of the corpus embeddings for a compact dense scan.
+
+Each dimension is mapped linearly from its calibrated [min, max] onto 0..255, so the scanned
+matrix is a quarter of its float32 size. The scan only nominates candidates; callers re-rank
+them against the exact float32 embeddings.
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+# Vectors used to calibrate the per-dimension ranges; below this the store is refitted from scratch
+CALIBRATION_SAMPLE = 10_000
+
+# Rows dequantized per matmul during a scan, bounding the float32 working set (~100 MB at 1536 dims)
+SCAN_BLOCK_ROWS = 16_384
+
+_CODES = "codes.u8"
+_IDS = "ids.jsonl"
+_CALIBRATION = "calibration.npy"
+
+
+class ScalarQuantizedStore:
+    """Append-only uint8 codes plus node ids on disk, scanned through a memory map."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._lo: Optional[np.ndarray] = None
+        self._scale: Optional[np.ndarray] = None
+        self._ids: list[str] = []
+        self._codes: Optional[np.memmap] = None
+
+        if (self.path / _CALIBRATION).exists():
+            self._lo, self._scale = np.load(self.path / _CALIBRATION)
+        if (self.path / _IDS).exists():
+            self._ids = [json.loads(line) for line in (self.path / _IDS).read_text().splitlines()]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def rebuild(self, ids: list[str], embeddings: np.ndarray) -> None:
+        """Recalibrate on (a sample of) the given vectors and re-encode all of them."""
+        x = np.asarray(embeddings, dtype=np.float32)
+        with self._lock:
+            for name in (_CODES, _IDS, _CALIBRATION):
+                (self.path / name).unlink(missing_ok=True)
+            self._ids, self._codes = [], None
+            self._lo = self._scale = None
+            if len(ids):
+                self._calibrate(x[:CALIBRATION_SAMPLE])
+                self._append(ids, x)
+
+    def add(self, ids: list[str], embeddings: np.ndarray) -> None:
+        """Encode and append vectors with the existing calibration (values outside it are clipped)."""
+        x = np.asarray(embeddings, dtype=np.float32)
+        with self._lock:
+            if self._lo is None:
+                self._calibrate(x[:CALIBRATION_SAMPLE])
+            self._append(ids, x)
+
+    def search(self, query: list[float], k: int) -> list[str]:
+        """Ids of the k codes with the highest approximate inner product with the query."""
+        with self._lock:
+            n = len(self._ids)
+            if n == 0 or k <= 0:
+                return []
+            if self._codes is None:
+                self._codes = np.memmap(
+                    self.path / _CODES, dtype=np.uint8, mode="r", shape=(n, self._lo.shape[0])
+                )
+            codes, ids = self._codes, self._ids
+
+        # x ~= lo + code * scale, so q.x ~= code . (q * scale) + q.lo
+        q = np.asarray(query, dtype=np.float32)
+        q_scaled = q * self._scale
+        scores = np.empty(n, dtype=np.float32)
+        for start in range(0, n, SCAN_BLOCK_ROWS):
+            block = codes[start:start + SCAN_BLOCK_ROWS]
+            scores[start:start + len(block)] = block.astype(np.float32) @ q_scaled
+        scores += float(q @ self._lo)
+
+        k = min(k, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [ids[i] for i in top[np.argsort(-scores[top])]]
+
+    def _calibrate(self, sample: np.ndarray) -> None:
+        self._lo = sample.min(axis=0)
+        self._scale = np.maximum(sample.max(axis=0) - self._lo, 1e-12) / 255
+        np.save(self.path / _CALIBRATION, np.stack([self._lo, self._scale]))
+
+    def _append(self, ids: list[str], x: np.ndarray) -> None:
+        codes = np.clip(np.rint((x - self._lo) / self._scale), 0, 255).astype(np.uint8)
+        with open(self.path / _CODES, "ab") as f:
+            f.write(codes.tobytes())
+        with open(self.path / _IDS, "a") as f:
+            f.writelines(json.dumps(i) + "\n" for i in ids)
+        self._ids.extend(ids)
+        self._codes = None
@@ -0,0 +1,103 @@
+"""SQLite-backed key-value store for the LlamaIndex docstore.
+
+Keeps nodes on disk (one row per key) instead of in a Python dict, so the docstore
+survives restarts and only the rows actually read are pulled into memory.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+from llama_index.core.storage.kvstore.types import DEFAULT_BATCH_SIZE, DEFAULT_COLLECTION, BaseKVStore
+
+
+class SQLiteKVStore(BaseKVStore):
+    """BaseKVStore over a single SQLite table keyed on (collection, key)."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS kv ("
+                "collection TEXT NOT NULL, key TEXT NOT NULL, val TEXT NOT NULL, "
+                "PRIMARY KEY (collection, key))"
+            )
+
+    def put(self, key: str, val: dict, collection: str = DEFAULT_COLLECTION) -> None:
+        self.put_all([(key, val)], collection=collection)
+
+    async def aput(self, key: str, val: dict, collection: str = DEFAULT_COLLECTION) -> None:
+        self.put(key, val, collection=collection)
+
+    def put_all(
+        self,
+        kv_pairs: list[tuple[str, dict]],
+        collection: str = DEFAULT_COLLECTION,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        rows = [(collection, key, json.dumps(val)) for key, val in kv_pairs]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO kv VALUES (?, ?, ?)", rows)
+
+    async def aput_all(
+        self,
+        kv_pairs: list[tuple[str, dict]],
+        collection: str = DEFAULT_COLLECTION,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        self.put_all(kv_pairs, collection=collection, batch_size=batch_size)
+
+    def get(self, key: str, collection: str = DEFAULT_COLLECTION) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT val FROM kv WHERE collection = ? AND key = ?", (collection, key)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    async def aget(self, key: str, collection: str = DEFAULT_COLLECTION) -> Optional[dict]:
+        return self.get(key, collection=collection)
+
+    def get_all(self, collection: str = DEFAULT_COLLECTION) -> dict[str, dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, val FROM kv WHERE collection = ?", (collection,)
+            ).fetchall()
+        return {key: json.loads(val) for key, val in rows}
+
+    async def aget_all(self, collection: str = DEFAULT_COLLECTION) -> dict[str, dict]:
+        return self.get_all(collection=collection)
+
+    def delete(self, key: str, collection: str = DEFAULT_COLLECTION) -> bool:
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "DELETE FROM kv WHERE collection = ? AND key = ?", (collection, key)
+            )
+        return cur.rowcount > 0
+
+    async def adelete(self, key: str, collection: str = DEFAULT_COLLECTION) -> bool:
+        return self.delete(key, collection=collection)
+
+    def count(self, collection: str = DEFAULT_COLLECTION) -> int:
+        """Number of keys in a collection, without loading any values."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM kv WHERE collection = ?", (collection,)
+            ).fetchone()[0]
+
+    def fingerprint(self, collection: str = DEFAULT_COLLECTION) -> str:
+        """SHA-256 over a collection's rows in key order; changes whenever any key or value does."""
+        digest = hashlib.sha256()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, val FROM kv WHERE collection = ? ORDER BY key", (collection,)
+            )
+            for key, val in rows:
+                digest.update(f"{key}\0{val}\n".encode())
+        return digest.hexdigest()
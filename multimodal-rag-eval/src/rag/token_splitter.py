@@ -0,0 +1,101 @@
+"""Fixed-size token-window splitter on tiktoken's Rust BPE."""
+
+import os
+from typing import Any, Sequence
+
+import tiktoken
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.node_parser import TextSplitter
+from llama_index.core.node_parser.node_utils import build_nodes_from_splits
+from llama_index.core.schema import BaseNode
+from llama_index.core.utils import get_tokenizer
+
+# Tokenizer of OpenAI's text-embedding-3 models
+DEFAULT_ENCODING = "cl100k_base"
+
+
+class TokenWindowSplitter(TextSplitter):
+    """Split text into windows of chunk_size tokens, each overlapping the previous by chunk_overlap.
+
+    All texts in a call are encoded together with tiktoken's batch encoder across num_threads
+    threads, and the windows decoded the same way; no Python-level sentence splitting runs. Windows do not
+    respect sentence boundaries.
+    """
+
+    chunk_size: int = Field(default=512, gt=0, description="Tokens per window.")
+    chunk_overlap: int = Field(default=50, ge=0, description="Tokens shared by consecutive windows.")
+    encoding_name: str = Field(default=DEFAULT_ENCODING, description="tiktoken encoding.")
+    num_threads: int = Field(
+        default_factory=lambda: os.cpu_count() or 1,
+        gt=0,
+        description="Threads tiktoken spreads a batch over when encoding and decoding.",
+    )
+
+    _encoding: tiktoken.Encoding = PrivateAttr()
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        if self.chunk_overlap >= self.chunk_size:
+            raise ValueError(
+                f"chunk_overlap ({self.chunk_overlap}) must be smaller than chunk_size ({self.chunk_size})"
+            )
+        # LlamaIndex bundles cl100k_base; loading its tokenizer registers it with tiktoken offline
+        get_tokenizer()
+        self._encoding = tiktoken.get_encoding(self.encoding_name)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "TokenWindowSplitter"
+
+    def split_text(self, text: str) -> list[str]:
+        return self._split_batch([text])[0]
+
+    def split_texts(self, texts: list[str]) -> list[str]:
+        return [chunk for chunks in self._split_batch(texts) for chunk in chunks]
+
+    def _parse_nodes(
+        self, nodes: Sequence[BaseNode], show_progress: bool = False, **kwargs: Any
+    ) -> list[BaseNode]:
+        # One batch for all nodes instead of TextSplitter's split_text per node
+        splits = self._split_batch([node.get_content() for node in nodes])
+        return [
+            chunk_node
+            for node, chunks in zip(nodes, splits)
+            for chunk_node in build_nodes_from_splits(chunks, node, id_func=self.id_func)
+        ]
+
+    def _split_batch(self, texts: list[str]) -> list[list[str]]:
+        step = self.chunk_size - self.chunk_overlap
+        token_lists = self._encoding.encode_ordinary_batch(texts, num_threads=self.num_threads)
+        windows, spans = [], []
+        for i, tokens in enumerate(token_lists):
+            # The last window ends at the text's end; a tail that fits in the overlap adds nothing new
+            for start in range(0, max(len(tokens) - self.chunk_overlap, 1), step):
+                windows.append(tokens[start:start + self.chunk_size])
+                spans.append((i, start, min(start + self.chunk_size, len(tokens))))
+
+        chunks: list[list[str]] = [[] for _ in texts]
+        raw_windows = self._encoding.decode_bytes_batch(windows, num_threads=self.num_threads)
+        for (i, start, end), raw in zip(spans, raw_windows):
+            chunk = self._decode_window(token_lists[i], start, end, raw)
+            if chunk.strip():
+                chunks[i].append(chunk)
+        return chunks
+
+    def _decode_window(self, tokens: list[int], start: int, end: int, raw: bytes) -> str:
+        """Decode tokens[start:end], widening it by whole tokens until neither edge splits a character.
+
+        BPE tokens can end partway through a multi-byte UTF-8 character (common in CJK text);
+        decoding such a window as-is would put U+FFFD into the chunk.
+        """
+        while True:
+            try:
+                return raw.decode("utf-8")
+            except UnicodeDecodeError:
+                if start > 0 and raw[0] & 0xC0 == 0x80:  # starts on a continuation byte
+                    start -= 1
+                elif end < len(tokens):
+                    end += 1
+                else:
+                    return raw.decode("utf-8", errors="replace")
+            raw = self._encoding.decode_bytes(tokens[start:end])